@@ -4,6 +4,7 @@ from dotenv import load_dotenv
 from flask_cors import CORS
 from .config import Config
 from .extensions import *
+from .extensions.metrics import register_request_metrics
 from .constants import *
 from flask import Flask 
 
@@ -21,6 +22,7 @@ def create_app(config_class=Config):
     CORS(app)
 
     register_error_handlers(app) 
+    register_request_metrics(app)
     register_blueprints(app)
     initialize_extensions(app)
     run_scheduler(app)
@@ -42,8 +44,10 @@ def register_blueprints(app):
 
 def run_scheduler(app):
     from .jobs.store_forecasts import store_forecasts
+    from .jobs.prune_forecast_snapshots import prune_forecast_snapshots
         
     scheduler = BackgroundScheduler()
     scheduler.add_job(store_forecasts, IntervalTrigger(hours=12), args=[app])
+    scheduler.add_job(prune_forecast_snapshots, IntervalTrigger(hours=FORECAST_PRUNE_INTERVAL_HOURS), args=[app])
     scheduler.start()
 
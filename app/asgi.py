@@ -0,0 +1,168 @@
+import re
+import math
+import time
+import asyncio
+import logging
+import orjson
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.exceptions import HTTPException
+from .constants import *
+from .enums import CustomStatusCode
+from .extensions import json_codec
+from .extensions.metrics import HTTP_REQUEST_SECONDS
+from .services import async_chat
+
+# Json parameters of the chat routes: name -> (type, required, pattern), as validated by
+# flask_parameter_validation in controllers/chat.py.
+START_CHAT_PARAMETERS = {
+    'stock': (str, True, None),
+    'user_id': (int, False, None),
+    'series_format': (str, False, r'^(columnar|rows)$')
+}
+PROMPT_PARAMETERS = {
+    'query': (str, True, None),
+    'chat_id': (int, True, None)
+}
+
+# path -> (service, parameters, streaming)
+ASYNC_ROUTES = {
+    '/start-chat': (async_chat.start_chat, START_CHAT_PARAMETERS, False),
+    '/prompt': (async_chat.continue_chat, PROMPT_PARAMETERS, False),
+    '/start-chat/stream': (async_chat.stream_start_chat, START_CHAT_PARAMETERS, True),
+    '/prompt/stream': (async_chat.stream_continue_chat, PROMPT_PARAMETERS, True)
+}
+
+EVENT_STREAM_HEADERS = [
+    (b'content-type', b'text/event-stream; charset=utf-8'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no')
+]
+
+
+def create_asgi_app(flask_app):
+    """
+    Wraps the Flask app in an ASGI app serving the chat routes natively with asyncio, so a worker
+    can hold many conversations waiting on the LLM. Every other route is served by the Flask app
+    through WsgiToAsgi.
+
+    At most ASYNC_CHAT_MAX_CONCURRENCY chat requests run at once per worker, and no more than the async
+    LLM client has connections (LLM_ASYNC_MAX_CONNECTIONS): a chat has one LLM call in flight at a time,
+    so admitted chats never wait on the connection pool. Further requests wait up to
+    ASYNC_CHAT_QUEUE_TIMEOUT seconds for a slot and are then rejected with a 503 and Retry-After.
+
+    Parameters:
+        flask_app (Flask): The app returned by create_app.
+
+    Returns:
+        Callable: The ASGI app.
+    """
+    wsgi_app = WsgiToAsgi(flask_app)
+    slots = asyncio.Semaphore(min(ASYNC_CHAT_MAX_CONCURRENCY, LLM_ASYNC_MAX_CONNECTIONS))
+
+    async def app(scope, receive, send):
+        route = ASYNC_ROUTES.get(scope.get('path')) if scope['type'] == 'http' and scope['method'] == 'POST' else None
+        if route is None:
+            return await wsgi_app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = await handle_chat_request(flask_app, slots, route, receive, send)
+        HTTP_REQUEST_SECONDS.labels(scope['method'], scope['path'], status).observe(time.perf_counter() - started)
+
+    return app
+
+async def handle_chat_request(flask_app, slots, route, receive, send):
+    """Runs a chat service within an app context and sends its response. Returns the status code."""
+    service, parameters, streaming = route
+
+    try:
+        body = orjson.loads(await read_body(receive))
+    except orjson.JSONDecodeError:
+        return await send_response(send, 400, CustomStatusCode.BAD_REQUEST.value, 'Could not parse JSON.')
+
+    error = validate_parameters(body, parameters)
+    if error:
+        return await send_response(send, 400, CustomStatusCode.BAD_REQUEST.value, error)
+
+    try:
+        await asyncio.wait_for(slots.acquire(), ASYNC_CHAT_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        headers = [(b'retry-after', str(math.ceil(ASYNC_CHAT_QUEUE_TIMEOUT)).encode())]
+        return await send_response(send, 503, CustomStatusCode.FAILURE.value, SERVICE_BUSY_MESSAGE, headers=headers)
+
+    try:
+        with flask_app.app_context():
+            try:
+                result = await service(body)
+            except HTTPException as e:
+                return await send_response(send, e.code, CustomStatusCode.FAILURE.value, e.description)
+            except Exception as e:
+                logging.exception(str(e), exc_info=e)
+                return await send_response(send, 500, CustomStatusCode.FAILURE.value, INTERNAL_SERVER_ERROR_MESSAGE)
+
+            if streaming:
+                await send_event_stream(result, receive, send)
+                return 200
+            return await send_response(send, 200, CustomStatusCode.SUCCESS.value, SUCCESS_MESSAGE, result)
+    finally:
+        slots.release()
+
+def validate_parameters(body, parameters):
+    """Returns the error message of the first invalid Json parameter, or None."""
+    if not isinstance(body, dict):
+        return 'Could not parse JSON.'
+
+    for name, (expected_type, required, pattern) in parameters.items():
+        value = body.get(name)
+        if value is None:
+            if required:
+                return f"Missing required json parameter '{name}'."
+            continue
+        if not isinstance(value, expected_type) or isinstance(value, bool):
+            return f"Parameter '{name}' must be type '{expected_type}'"
+        if pattern and not re.match(pattern, value):
+            return f"Parameter '{name}' pattern does not match: {pattern}."
+    return None
+
+async def read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+async def send_response(send, status, code, message, data=None, headers=()):
+    """Sends a JSON response shaped like helpers.create_response. Returns the status code."""
+    response = {"status": code, "message": message}
+    if data is not None:
+        response["data"] = data
+
+    await send({'type': 'http.response.start', 'status': status, 'headers': [(b'content-type', b'application/json'), *headers]})
+    await send({'type': 'http.response.body', 'body': json_codec.dumps(response).encode()})
+    return status
+
+async def send_event_stream(events, receive, send):
+    """Sends the events of an async generator as they come, stopping it if the client disconnects."""
+    async def stream():
+        await send({'type': 'http.response.start', 'status': 200, 'headers': EVENT_STREAM_HEADERS})
+        async for event in events:
+            await send({'type': 'http.response.body', 'body': event.encode(), 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def wait_for_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    streaming = asyncio.ensure_future(stream())
+    disconnected = asyncio.ensure_future(wait_for_disconnect())
+    try:
+        await asyncio.wait({streaming, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        disconnected.cancel()
+        if not streaming.done():
+            streaming.cancel()
+            await asyncio.gather(streaming, return_exceptions=True)
+        await events.aclose()
+
+    if not streaming.cancelled():
+        streaming.result()
@@ -1,6 +1,11 @@
 from ..constants import *
+from ..extensions import json_codec
 
 class Config(object):
     SECRET_KEY = APP_SECRET_KEY
     SQLALCHEMY_DATABASE_URI = DATABASE_URL
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'json_serializer': json_codec.dumps,
+        'json_deserializer': json_codec.loads
+    }
\ No newline at end of file
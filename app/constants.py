@@ -9,6 +9,72 @@ SERPAPI_API_KEY = os.getenv('SERPAPI_API_KEY')
 #Flask Config
 APP_SECRET_KEY = os.getenv('APP_SECRET_KEY')
 
+#Forecast Job Config
+FORECAST_TICKERS = [ticker.strip().upper() for ticker in (os.getenv('FORECAST_TICKERS') or 'AAPL,GOOG,MSFT,TSLA').split(',') if ticker.strip()]
+FORECAST_TIME_PERIOD = os.getenv('FORECAST_TIME_PERIOD') or '6m'
+FORECAST_DAYS = int(os.getenv('FORECAST_DAYS') or 7)
+FORECAST_SHARD_SIZE = int(os.getenv('FORECAST_SHARD_SIZE') or 100)
+FORECAST_RUN_RESUME_HOURS = float(os.getenv('FORECAST_RUN_RESUME_HOURS') or 12)
+FORECAST_SNAPSHOT_RETENTION = int(os.getenv('FORECAST_SNAPSHOT_RETENTION') or 3)
+FORECAST_PRUNE_INTERVAL_HOURS = float(os.getenv('FORECAST_PRUNE_INTERVAL_HOURS') or 1)
+FORECAST_CACHE_TTL = float(os.getenv('FORECAST_CACHE_TTL') or 30)
+FORECAST_WORKERS = int(os.getenv('FORECAST_WORKERS') or os.cpu_count() or 1)
+FORECAST_TICKER_TIMEOUT = float(os.getenv('FORECAST_TICKER_TIMEOUT') or 600)
+ARIMA_ORDER_RESEARCH_DAYS = int(os.getenv('ARIMA_ORDER_RESEARCH_DAYS') or 7)
+ARIMA_ORDER_AIC_TOLERANCE = float(os.getenv('ARIMA_ORDER_AIC_TOLERANCE') or 10)
+MODEL_STORE_DIR = os.getenv('MODEL_STORE_DIR') or os.path.join('storage', 'models')
+MODEL_REFIT_DAYS = int(os.getenv('MODEL_REFIT_DAYS') or 7)
+MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR') or os.path.join('storage', 'model_cache')
+MODEL_CACHE_MAX_MB = float(os.getenv('MODEL_CACHE_MAX_MB') or 512)
+FORECAST_MAX_HORIZON = int(os.getenv('FORECAST_MAX_HORIZON') or 90)
+FORECAST_ENGINE = (os.getenv('FORECAST_ENGINE') or 'arimax').lower()
+FAST_AR_LAGS = int(os.getenv('FAST_AR_LAGS') or 3)
+FAST_AR_WINDOW = int(os.getenv('FAST_AR_WINDOW') or 250)
+PRICE_STORE_DIR = os.getenv('PRICE_STORE_DIR') or os.path.join('storage', 'prices')
+PRICE_STORE_ENABLED = (os.getenv('PRICE_STORE_ENABLED') or 'true').lower() == 'true'
+PRICE_STORE_OFFLINE = (os.getenv('PRICE_STORE_OFFLINE') or 'false').lower() == 'true'
+
+#LLM Config
+LLM_MODEL = os.getenv('LLM_MODEL') or 'llama-3.3-70b-versatile'
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT') or 60)
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES') or 2)
+LLM_MAX_CONNECTIONS = int(os.getenv('LLM_MAX_CONNECTIONS') or 20)
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('LLM_MAX_KEEPALIVE_CONNECTIONS') or 10)
+LLM_KEEPALIVE_EXPIRY = float(os.getenv('LLM_KEEPALIVE_EXPIRY') or 30)
+LLM_POOL_TIMEOUT = float(os.getenv('LLM_POOL_TIMEOUT') or 30)
+
+#Market Analysis Config
+MARKET_ANALYSIS_PRECOMPUTE = (os.getenv('MARKET_ANALYSIS_PRECOMPUTE') or 'false').lower() == 'true'
+MARKET_ANALYSIS_WORKERS = int(os.getenv('MARKET_ANALYSIS_WORKERS') or 4)
+PROMPT_CONTEXT_TOKEN_BUDGET = int(os.getenv('PROMPT_CONTEXT_TOKEN_BUDGET') or 600)
+PROMPT_CONTEXT_RECENT_BARS = int(os.getenv('PROMPT_CONTEXT_RECENT_BARS') or 10)
+PROMPT_CONTEXT_HISTORY_POINTS = int(os.getenv('PROMPT_CONTEXT_HISTORY_POINTS') or 24)
+
+#Chat Config
+CHAT_HISTORY_PAGE_SIZE = int(os.getenv('CHAT_HISTORY_PAGE_SIZE') or 50)
+CHAT_HISTORY_MAX_PAGE_SIZE = int(os.getenv('CHAT_HISTORY_MAX_PAGE_SIZE') or 200)
+CHAT_LIST_PAGE_SIZE = int(os.getenv('CHAT_LIST_PAGE_SIZE') or 20)
+CHAT_LIST_MAX_PAGE_SIZE = int(os.getenv('CHAT_LIST_MAX_PAGE_SIZE') or 100)
+CHAT_CONTEXT_TURNS = int(os.getenv('CHAT_CONTEXT_TURNS') or 6)
+CHAT_SUMMARY_BATCH_TURNS = int(os.getenv('CHAT_SUMMARY_BATCH_TURNS') or 4)
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv('CHAT_SUMMARY_MAX_TOKENS') or 400)
+# Checkpoints kept per chat; older ones and the blobs only they use are deleted (at least 2, for pending sends)
+CHAT_CHECKPOINTS_KEPT = int(os.getenv('CHAT_CHECKPOINTS_KEPT') or 2)
+
+#Async Chat Config
+ASYNC_CHAT_MAX_CONCURRENCY = int(os.getenv('ASYNC_CHAT_MAX_CONCURRENCY') or 200)
+# Connections of the async LLM client: one per chat admitted, as a chat has one LLM call in flight at a time
+LLM_ASYNC_MAX_CONNECTIONS = int(os.getenv('LLM_ASYNC_MAX_CONNECTIONS') or ASYNC_CHAT_MAX_CONCURRENCY)
+ASYNC_CHAT_QUEUE_TIMEOUT = float(os.getenv('ASYNC_CHAT_QUEUE_TIMEOUT') or 5)
+
+#Market Data Config
+MARKET_DATA_PROVIDER = os.getenv('MARKET_DATA_PROVIDER') or 'yahoo'
+MARKET_DATA_BATCH_SIZE = int(os.getenv('MARKET_DATA_BATCH_SIZE') or 50)
+# Tickers downloaded at once, each request is I/O bound
+MARKET_DATA_MAX_WORKERS = int(os.getenv('MARKET_DATA_MAX_WORKERS') or 16)
+MARKET_DATA_RETRIES = int(os.getenv('MARKET_DATA_RETRIES') or 2)
+MARKET_DATA_FIXTURES_DIR = os.getenv('MARKET_DATA_FIXTURES_DIR') or os.path.join('storage', 'fixtures')
+
 YOUTUBE_TRANSCRIPTS_ERROR_MESSAGE = "Failed to fetch transcripts, pls try again later"
 
 #Repsonse Messages
@@ -16,6 +82,7 @@ NOT_FOUND_MESSAGE = 'Not found'
 SUCCESS_MESSAGE = 'Success'
 INTERNAL_SERVER_ERROR_MESSAGE = 'Something went wrong'
 INVALID_CREDENTIALS = 'Invalid Credentials'
+SERVICE_BUSY_MESSAGE = 'Too many requests in progress, please try again later'
 
 
 DUMMY_STOCK_PRICES ="""
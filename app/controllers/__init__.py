@@ -5,4 +5,6 @@ routes_blueprint = Blueprint(
 )
 
 from . import auth
-from . import chat
\ No newline at end of file
+from . import chat
+from . import forecast
+from . import metrics
\ No newline at end of file
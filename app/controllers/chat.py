@@ -1,18 +1,18 @@
 from . import routes_blueprint
 from ..services import chat
-from flask import request
-from flask_parameter_validation import ValidateParameters, Json, Route
+from flask import request, Response, stream_with_context
+from flask_parameter_validation import ValidateParameters, Json, Route, Query
 from app.models import Chat
 from app.repository import base
 from typing import Optional
 from ..error_handler import url_validation_error_handler
 from ..helpers import create_response
-from ..constants import SUCCESS_MESSAGE
+from ..constants import SUCCESS_MESSAGE, CHAT_HISTORY_PAGE_SIZE, CHAT_HISTORY_MAX_PAGE_SIZE, CHAT_LIST_PAGE_SIZE, CHAT_LIST_MAX_PAGE_SIZE
 from ..enums import CustomStatusCode
 
 @routes_blueprint.route('/start-chat', methods=['POST'])
 @ValidateParameters(url_validation_error_handler)
-def start_chat(stock:str = Json(), user_id: Optional[int] = Json()):
+def start_chat(stock:str = Json(), user_id: Optional[int] = Json(), series_format: Optional[str] = Json(pattern=r'^(columnar|rows)$')):
     response = chat.start_chat(request.get_json())
     return create_response(CustomStatusCode.SUCCESS.value, SUCCESS_MESSAGE, response), 200
 
@@ -21,15 +21,37 @@ def continue_chat(query:str = Json(), chat_id: int = Json()):
     response = chat.continue_chat(request.get_json())
     return create_response(CustomStatusCode.SUCCESS.value, SUCCESS_MESSAGE, response), 200
 
+@routes_blueprint.route('/start-chat/stream', methods=['POST'])
+@ValidateParameters(url_validation_error_handler)
+def stream_start_chat(stock:str = Json(), user_id: Optional[int] = Json(), series_format: Optional[str] = Json(pattern=r'^(columnar|rows)$')):
+    events = chat.stream_start_chat(request.get_json())
+    return create_event_stream(events)
+
+@routes_blueprint.route('/prompt/stream', methods=['POST'])
+@ValidateParameters(url_validation_error_handler)
+def stream_continue_chat(query:str = Json(), chat_id: int = Json()):
+    events = chat.stream_continue_chat(request.get_json())
+    return create_event_stream(events)
+
+def create_event_stream(events):
+    # Buffering by a reverse proxy would hold back the events until the stream ends
+    return Response(stream_with_context(events), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @routes_blueprint.route('/chats/<int:id>', methods=['GET'])
 @ValidateParameters(url_validation_error_handler)
 def get_note(id:int = Route()):
     chat = base.get_record_by_field(Chat, "id", id)
     return create_response(CustomStatusCode.SUCCESS.value, SUCCESS_MESSAGE, chat.serialize_without_graph()), 200
 
+@routes_blueprint.route('/chats/<int:id>/messages', methods=['GET'])
+@ValidateParameters(url_validation_error_handler)
+def get_chat_messages(id:int = Route(), after_seq: int = Query(0, min_int=0), limit: int = Query(CHAT_HISTORY_PAGE_SIZE, min_int=1, max_int=CHAT_HISTORY_MAX_PAGE_SIZE)):
+    response = chat.get_chat_messages(id, after_seq, limit)
+    return create_response(CustomStatusCode.SUCCESS.value, SUCCESS_MESSAGE, response), 200
+
 @routes_blueprint.route('/users/<int:user_id>/chats', methods=['GET'])
 @ValidateParameters(url_validation_error_handler)
-def get_user_notes(user_id:int = Route()):
-    chats = chat.get_user_chats(user_id)
+def get_user_notes(user_id:int = Route(), cursor: Optional[str] = Query(), limit: int = Query(CHAT_LIST_PAGE_SIZE, min_int=1, max_int=CHAT_LIST_MAX_PAGE_SIZE)):
+    chats = chat.get_user_chats(user_id, cursor, limit)
     return create_response(CustomStatusCode.SUCCESS.value, SUCCESS_MESSAGE, chats), 200
 
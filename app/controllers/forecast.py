@@ -0,0 +1,13 @@
+from . import routes_blueprint
+from ..services import forecast
+from flask_parameter_validation import ValidateParameters, Route, Query
+from ..error_handler import url_validation_error_handler
+from ..helpers import create_response
+from ..constants import SUCCESS_MESSAGE, FORECAST_MAX_HORIZON
+from ..enums import CustomStatusCode
+
+@routes_blueprint.route('/forecasts/<string:ticker>', methods=['GET'])
+@ValidateParameters(url_validation_error_handler)
+def get_forecast(ticker: str = Route(), days: int = Query(7, min_int=1, max_int=FORECAST_MAX_HORIZON)):
+    response = forecast.get_ticker_forecast(ticker, days)
+    return create_response(CustomStatusCode.SUCCESS.value, SUCCESS_MESSAGE, response), 200
@@ -0,0 +1,8 @@
+from . import routes_blueprint
+from flask import Response
+from ..extensions.metrics import generate_metrics
+
+@routes_blueprint.route('/metrics', methods=['GET'])
+def get_metrics():
+    body, content_type = generate_metrics()
+    return Response(body, content_type=content_type), 200
@@ -1 +1,2 @@
 from .custom_status_code import CustomStatusCode
+from .forecast_status import ForecastRunStatus, ForecastTickerStatus
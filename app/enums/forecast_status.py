@@ -0,0 +1,13 @@
+from enum import Enum, unique
+
+@unique
+class ForecastRunStatus(Enum):
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    ABANDONED = 'abandoned'
+
+@unique
+class ForecastTickerStatus(Enum):
+    PENDING = 'pending'
+    DONE = 'done'
+    FAILED = 'failed'
@@ -0,0 +1,11 @@
+import orjson
+
+# JSON codec used for the database's JSON columns (see Config.SQLALCHEMY_ENGINE_OPTIONS).
+# orjson is several times faster than the standard library, serializes NumPy values directly,
+# and writes NaN and infinities as null so the output is always valid JSON.
+
+def dumps(data):
+    return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+
+def loads(data):
+    return orjson.loads(data)
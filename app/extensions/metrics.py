@@ -0,0 +1,121 @@
+import os
+import time
+from functools import wraps
+from flask import g, request
+from werkzeug.exceptions import HTTPException
+from prometheus_client import Counter, Histogram, CollectorRegistry, REGISTRY, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import multiprocess
+
+# Under gunicorn, PROMETHEUS_MULTIPROC_DIR is set (see gunicorn.conf.py) and every worker writes
+# its samples there, so /metrics reports the sum over all workers rather than the one serving it.
+
+# Pipeline stages and LLM calls run from milliseconds to minutes.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+PIPELINE_STAGE_SECONDS = Histogram(
+    'quantai_pipeline_stage_seconds', 'Duration of forecasting pipeline stages.', ['stage'], buckets=LATENCY_BUCKETS)
+PIPELINE_STAGE_FAILURES = Counter(
+    'quantai_pipeline_stage_failures_total', 'Forecasting pipeline stages that raised an exception.', ['stage'])
+
+GRAPH_NODE_SECONDS = Histogram(
+    'quantai_graph_node_seconds', 'Duration of LangGraph node runs.', ['node'], buckets=LATENCY_BUCKETS)
+GRAPH_NODE_FAILURES = Counter(
+    'quantai_graph_node_failures_total', 'LangGraph node runs that raised an exception.', ['node'])
+
+DB_CALL_SECONDS = Histogram(
+    'quantai_db_call_seconds', 'Duration of repository calls.', ['operation', 'model'], buckets=LATENCY_BUCKETS)
+DB_CALL_FAILURES = Counter(
+    'quantai_db_call_failures_total', 'Repository calls that raised an exception.', ['operation', 'model'])
+
+PROMPT_CONTEXT_TOKENS = Histogram(
+    'quantai_prompt_context_tokens', 'Estimated size in tokens of the price digests put in market analysis prompts.',
+    buckets=(100, 200, 300, 400, 600, 800, 1200, 1600, 2400, 3200))
+
+CHAT_CONTEXT_TOKENS = Histogram(
+    'quantai_chat_context_tokens', 'Estimated size in tokens of the summary and chat history put in follow up prompts.',
+    buckets=(100, 200, 400, 800, 1200, 1600, 2400, 3200, 4800, 6400))
+
+MARKET_ANALYSIS_LOOKUPS = Counter(
+    'quantai_market_analysis_lookups_total', 'Market analyses served from the cache (hit) or generated (miss).', ['result'])
+
+HTTP_REQUEST_SECONDS = Histogram(
+    'quantai_http_request_seconds', 'Duration of HTTP requests.', ['method', 'route', 'status'], buckets=LATENCY_BUCKETS)
+
+
+def record(histogram, failures, seconds, failed=False, **labels):
+    histogram.labels(**labels).observe(seconds)
+    if failed:
+        failures.labels(**labels).inc()
+
+def timed(histogram, failures, get_labels, expected_errors=()):
+    """
+    Decorator recording the duration of every call in histogram, and counting calls that raise
+    in failures. get_labels receives the call's arguments and returns the label values.
+    Exceptions of expected_errors (such as the 404 of a missing record) are re-raised without
+    being counted as failures.
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            failed = True
+            try:
+                result = function(*args, **kwargs)
+                failed = False
+                return result
+            except expected_errors:
+                failed = False
+                raise
+            finally:
+                record(histogram, failures, time.perf_counter() - started, failed, **get_labels(*args, **kwargs))
+        return wrapper
+    return decorator
+
+def time_stage(stage):
+    """Decorator timing a forecasting pipeline stage."""
+    return timed(PIPELINE_STAGE_SECONDS, PIPELINE_STAGE_FAILURES, lambda *args, **kwargs: {'stage': stage})
+
+def time_db_call(function):
+    """Decorator timing a repository function whose first argument is the model queried."""
+    def get_labels(model=None, *args, **kwargs):
+        return {'operation': function.__name__, 'model': getattr(model, '__name__', 'unknown')}
+
+    return timed(DB_CALL_SECONDS, DB_CALL_FAILURES, get_labels, expected_errors=HTTPException)(function)
+
+def time_db_operation(operation, model):
+    """Decorator timing a repository function that always queries the same model."""
+    return timed(DB_CALL_SECONDS, DB_CALL_FAILURES, lambda *args, **kwargs: {'operation': operation, 'model': model},
+                 expected_errors=HTTPException)
+
+def get_metrics_registry():
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+def generate_metrics():
+    """Returns (body, content_type) of the Prometheus text exposition of all metrics."""
+    return generate_latest(get_metrics_registry()), CONTENT_TYPE_LATEST
+
+def register_request_metrics(app):
+    """Record the latency of every request, labelled by route template rather than raw path."""
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_duration(response):
+        started = g.pop('request_started', None)
+        if started is None:
+            return response
+
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        labels = HTTP_REQUEST_SECONDS.labels(request.method, route, response.status_code)
+
+        # A streamed response is only done once the server has sent its last chunk and closes it.
+        if response.is_streamed:
+            response.call_on_close(lambda: labels.observe(time.perf_counter() - started))
+        else:
+            labels.observe(time.perf_counter() - started)
+        return response
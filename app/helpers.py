@@ -5,6 +5,7 @@ from functools import wraps
 import jwt
 import datetime
 from .constants import APP_SECRET_KEY
+from .extensions import json_codec
 import secrets
 
 def is_valid_number(value):
@@ -43,6 +44,10 @@ def create_response(status: bool, message: str, data=None):
         response["data"] = data
     return jsonify(response)
 
+def format_event(event: str, data) -> str:
+    """Formats a Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json_codec.dumps(data)}\n\n"
+
 
 def generate_jwt_token(user):
     token = secrets.token_hex(16)
@@ -0,0 +1,11 @@
+import logging
+from app.constants import FORECAST_SNAPSHOT_RETENTION
+from app.repository.forecast_run import prune_snapshots
+from app.extensions.metrics import time_stage
+
+@time_stage('prune_forecast_snapshots')
+def prune_forecast_snapshots(app):
+    with app.app_context():
+        pruned = prune_snapshots(FORECAST_SNAPSHOT_RETENTION)
+        if pruned:
+            logging.info(f"Pruned {pruned} old forecast snapshots.")
@@ -1,60 +1,82 @@
 import logging
-from app.services.stock_forecast import fetch_stocks_data, preprocess_data, build_arimax_model
-from app.helpers import add_records_to_database
-from app.models import StockForecast
-from app.extensions import session
-import jsonpickle 
+from app.services.stock_forecast import fetch_stocks_data, preprocess_data, build_forecast_models
+from app.services.price_series import encode_price_series
+from app.services.market_analysis import precompute_market_analyses
+from app.constants import FORECAST_ENGINE, FORECAST_TICKERS, FORECAST_TIME_PERIOD, FORECAST_DAYS, FORECAST_SHARD_SIZE, MARKET_ANALYSIS_PRECOMPUTE
+from app.enums import ForecastRunStatus
+from app.repository.arima_order import get_cached_orders, save_orders
+from app.repository.forecast_run import get_tracked_tickers, start_or_resume_run, get_pending_shards, save_shard_results, complete_run
+from app.extensions.metrics import time_stage
 
-# Test
+@time_stage('store_forecasts')
 def store_forecasts(app):
      with app.app_context():
-        ticker_list = ['AAPL', 'GOOG', 'MSFT', 'TSLA']  
-        time_period = '6m'  
-        forecast_days = 7 
+        # The universe is the tracked_tickers table, or FORECAST_TICKERS while it is empty
+        ticker_list = get_tracked_tickers() or FORECAST_TICKERS
 
         logging.info("Starting scheduled pipeline job...")
-        
-        # Fetch and preprocess stock data
-        df, retrieved_stocks = fetch_stocks_data(ticker_list, time_period)
-        if df is None:
-            logging.error("No data fetched. Exiting job.")
-            return
-        
-        df_preprocessed = preprocess_data(df)
-        if df_preprocessed is None:
-            logging.error("Data preprocessing failed. Exiting job.")
-            return
-        
-        # Run ARIMAX model for each stock
-        results = {}
-        for ticker in ticker_list:
-            logging.info(f"Processing ARIMAX model for {ticker}...")
-            df_ticker = df_preprocessed[df_preprocessed['Ticker'] == ticker]
-            if df_ticker.empty:
-                logging.warning(f"No valid data for {ticker}. Skipping.")
-                continue
-            
-            results[ticker] = build_arimax_model(df_ticker, forecast_days)
-
-        formatted_predictions = {}
-
-        for ticker, data in results.items():
-
-            formatted_predictions[ticker] = [
-                {"date": date, "price": round(price, 2)}
-                for date, price in zip(data["forecast_dates"], data["forecast"])
-            ]
-
-        session.query(StockForecast).delete()
-        session.commit()
-
-        stock_forecast_info = []
-        for ticker in ticker_list:
-            stock_forecast_info.append(StockForecast(
-                ticker=ticker,
-                retrieved_data=jsonpickle.encode(retrieved_stocks[ticker]),
-                forecast=jsonpickle.encode(formatted_predictions[ticker])
-            ))
-
-        add_records_to_database(stock_forecast_info)
-        
+
+        # Tickers are processed shard by shard, and each shard's forecasts and progress are saved
+        # together, so after a crash or restart the run resumes with the first unfinished shard
+        run = start_or_resume_run(ticker_list, FORECAST_SHARD_SIZE)
+
+        for shard, shard_tickers in get_pending_shards(run):
+            logging.info(f"Forecasting shard {shard} of run {run.id} ({len(shard_tickers)} tickers)...")
+
+            try:
+                forecasts, failures = forecast_shard(shard_tickers)
+            except Exception as e:
+                logging.exception(f"Forecasting shard {shard} of run {run.id} failed: {e}")
+                forecasts, failures = {}, {ticker: str(e) for ticker in shard_tickers}
+
+            save_shard_results(run, forecasts, failures)
+
+        # Once every ticker is done or failed, the run's snapshot replaces the served one at once
+        counts = complete_run(run)
+        logging.info(f"Forecast run {run.id} finished with {counts}.")
+
+        # Analyses are generated once per ticker here rather than on the first chat about it
+        if MARKET_ANALYSIS_PRECOMPUTE and run.status == ForecastRunStatus.COMPLETED.value:
+            stored, failed = precompute_market_analyses(run.id)
+            logging.info(f"Stored {stored} market analyses for run {run.id} ({failed} failed).")
+
+def forecast_shard(ticker_list):
+    """
+    Fetch, preprocess and forecast one shard of tickers.
+
+    Returns:
+    - ({ticker: {'retrieved_data', 'forecast'}}, {ticker: error}) covering every ticker in ticker_list.
+    """
+    # Fetch and preprocess stock data
+    df, retrieved_stocks = fetch_stocks_data(ticker_list, FORECAST_TIME_PERIOD)
+    if df is None:
+        return {}, {ticker: "No data fetched" for ticker in ticker_list}
+
+    df_preprocessed = preprocess_data(df)
+    if df_preprocessed is None:
+        return {}, {ticker: "Data preprocessing failed" for ticker in ticker_list}
+
+    # Run the forecast engine for each stock. The ARIMAX engine fits tickers in parallel
+    # and reuses cached ARIMA orders so the auto_arima search only runs when it is due
+    if FORECAST_ENGINE == 'arimax':
+        results = build_forecast_models(df_preprocessed, ticker_list, FORECAST_DAYS, engine='arimax', orders=get_cached_orders(ticker_list))
+        save_orders(results)
+    else:
+        results = build_forecast_models(df_preprocessed, ticker_list, FORECAST_DAYS, engine=FORECAST_ENGINE)
+
+    forecasts = {}
+    failures = {}
+
+    for ticker in ticker_list:
+        data = results.get(ticker)
+        if data is None or ticker not in retrieved_stocks:
+            logging.warning(f"No forecast produced for {ticker}. Skipping.")
+            failures[ticker] = "No forecast produced"
+            continue
+
+        forecasts[ticker] = {
+            'retrieved_data': retrieved_stocks[ticker],
+            'forecast': encode_price_series(data["forecast_dates"], data["forecast"])
+        }
+
+    return forecasts, failures
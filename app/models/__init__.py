@@ -1,6 +1,13 @@
 from .user import User
 from .user_session import UserSession
 from .chat import Chat
+from .chat_message import ChatMessage
 from .stock_forecast import StockForecast
+from .arima_order import ArimaOrder
+from .tracked_ticker import TrackedTicker
+from .forecast_run import ForecastRun, ForecastProgress, CurrentForecastSnapshot
+from .graph_checkpoint import GraphCheckpoint, GraphCheckpointBlob, GraphCheckpointWrite
+from .market_analysis import MarketAnalysis
 
-__all__ = ['User', 'Chat', 'UserSession', 'StockForecast']
\ No newline at end of file
+__all__ = ['User', 'Chat', 'ChatMessage', 'UserSession', 'StockForecast', 'ArimaOrder', 'TrackedTicker', 'ForecastRun', 'ForecastProgress', 'CurrentForecastSnapshot',
+           'GraphCheckpoint', 'GraphCheckpointBlob', 'GraphCheckpointWrite', 'MarketAnalysis']
\ No newline at end of file
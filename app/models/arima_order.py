@@ -0,0 +1,23 @@
+from app.extensions import database
+from sqlalchemy.sql import func
+
+class ArimaOrder(database.Model):
+    __tablename__ = "arima_orders"
+
+    id = database.Column(database.Integer, primary_key=True)
+    ticker = database.Column(database.String(10), nullable=False, unique=True)
+    p = database.Column(database.Integer, nullable=False)
+    d = database.Column(database.Integer, nullable=False)
+    q = database.Column(database.Integer, nullable=False)
+    aic = database.Column(database.Float, nullable=False)
+    searched_at = database.Column(database.DateTime(timezone=True), nullable=False)
+    fitted_at = database.Column(database.DateTime(timezone=True), nullable=False)
+    created_at = database.Column(database.DateTime(timezone=True), server_default=func.now())
+
+
+    def __repr__(self):
+        return f'<ArimaOrder {self.ticker} ({self.p}, {self.d}, {self.q})>'
+
+    @property
+    def order(self):
+        return (self.p, self.d, self.q)
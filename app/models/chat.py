@@ -1,20 +1,32 @@
 from app.extensions import database, session
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 import jsonpickle
 import zlib
 
+# Length the preview of a chat's latest message is cut to
+PREVIEW_LENGTH = 255
+
 class Chat(database.Model):
     __tablename__ = 'chats'
+    __table_args__ = (
+        # Serves the listing of a user's chats, most recently active first (see repository/chat.py)
+        database.Index('ix_chats_user_id_last_activity_at', 'user_id', 'last_activity_at', 'id'),
+    )
 
     id = database.Column(database.Integer, primary_key=True)
     user_id = database.Column(database.Integer, database.ForeignKey('users.id'), nullable=False)
     title = database.Column(database.String(255), nullable=True)
-    graph = database.Column(database.LargeBinary, nullable=False)
-    memory = database.Column(database.LargeBinary, nullable=False)
+    # No longer written: conversation state lives in the graph checkpoint tables (see services/checkpointer.py).
+    # Deferred so it is only loaded from the database when read.
+    graph = deferred(database.Column(database.LargeBinary, nullable=True))
+    # The latest message, kept up to date by repository.chat_message.append_messages for chat listings
+    preview = database.Column(database.String(PREVIEW_LENGTH), nullable=True)
+    last_activity_at = database.Column(database.DateTime(timezone=True), server_default=func.now(), nullable=False)
     created_at = database.Column(database.DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User", back_populates="chats") 
+    messages = relationship("ChatMessage", back_populates="chat", order_by="ChatMessage.seq", lazy="dynamic", passive_deletes=True)
 
     def __repr__(self):
         return f'<Chat {self.id}>'
@@ -25,7 +37,7 @@ class Chat(database.Model):
             'id': self.id,
             'user_id': self.user_id,
             "title": self.title,
-            "memory": self.extract_data(self.memory),
+            "memory": self.get_memory(),
             "graph": self.extract_data(self.graph)
         }
     
@@ -34,18 +46,35 @@ class Chat(database.Model):
             'id': self.id,
             'user_id': self.user_id,
             "title": self.title,
-            "memory": self.extract_data(self.memory)
+            "memory": self.get_memory()
         }
-    
-    def update_memory(self, memory):
-        self.memory = self.compress_data(memory)
-        session.commit()
+
+    def serialize_summary(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            "title": self.title,
+            "preview": self.preview,
+            "last_activity_at": self.last_activity_at.isoformat() if self.last_activity_at else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None
+        }
+
+    @staticmethod
+    def get_preview(content):
+        return " ".join(content.split())[:PREVIEW_LENGTH]
+
+    def get_memory(self):
+        # The chat's messages in the {role: content} form of the former memory blob
+        return [{message.role: message.content} for message in self.messages]
 
     def update_graph(self, graph):
         self.graph = self.compress_data(graph)
         session.commit()
 
     def extract_data(self, data):
+        if data is None:
+            return None
+
         try:
             decompressed = zlib.decompress(data).decode("utf-8")
             return jsonpickle.decode(decompressed)
@@ -0,0 +1,30 @@
+from app.extensions import database
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+class ChatMessage(database.Model):
+    __tablename__ = 'chat_messages'
+    __table_args__ = (
+        database.UniqueConstraint('chat_id', 'seq'),
+    )
+
+    id = database.Column(database.Integer, primary_key=True)
+    chat_id = database.Column(database.Integer, database.ForeignKey('chats.id', ondelete='CASCADE'), nullable=False)
+    # Position of the message in its chat, from 1
+    seq = database.Column(database.Integer, nullable=False)
+    role = database.Column(database.String(10), nullable=False)
+    content = database.Column(database.Text, nullable=False)
+    created_at = database.Column(database.DateTime(timezone=True), server_default=func.now())
+
+    chat = relationship("Chat", back_populates="messages")
+
+    def __repr__(self):
+        return f'<ChatMessage {self.chat_id} #{self.seq}>'
+
+    def serialize(self):
+        return {
+            'seq': self.seq,
+            'role': self.role,
+            'content': self.content,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
@@ -0,0 +1,55 @@
+from app.extensions import database
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+class ForecastRun(database.Model):
+    __tablename__ = "forecast_runs"
+
+    id = database.Column(database.Integer, primary_key=True)
+    status = database.Column(database.String(20), nullable=False)
+    ticker_count = database.Column(database.Integer, nullable=False)
+    shard_size = database.Column(database.Integer, nullable=False)
+    started_at = database.Column(database.DateTime(timezone=True), nullable=False)
+    finished_at = database.Column(database.DateTime(timezone=True), nullable=True)
+    created_at = database.Column(database.DateTime(timezone=True), server_default=func.now())
+
+    progress = relationship("ForecastProgress", back_populates="run", cascade="all, delete-orphan", passive_deletes=True)
+
+
+    def __repr__(self):
+        return f'<ForecastRun {self.id} {self.status}>'
+
+
+class ForecastProgress(database.Model):
+    __tablename__ = "forecast_progress"
+    __table_args__ = (
+        database.UniqueConstraint('run_id', 'ticker'),
+        database.Index('ix_forecast_progress_run_id_status', 'run_id', 'status'),
+    )
+
+    id = database.Column(database.Integer, primary_key=True)
+    run_id = database.Column(database.Integer, database.ForeignKey('forecast_runs.id', ondelete='CASCADE'), nullable=False)
+    ticker = database.Column(database.String(10), nullable=False)
+    shard = database.Column(database.Integer, nullable=False)
+    status = database.Column(database.String(20), nullable=False)
+    error = database.Column(database.Text, nullable=True)
+    updated_at = database.Column(database.DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    run = relationship("ForecastRun", back_populates="progress")
+
+
+    def __repr__(self):
+        return f'<ForecastProgress {self.run_id} {self.ticker} {self.status}>'
+
+
+class CurrentForecastSnapshot(database.Model):
+    """Single-row pointer to the forecast run whose stock_forecasts rows are served."""
+    __tablename__ = "current_forecast_snapshot"
+
+    id = database.Column(database.Integer, primary_key=True)
+    run_id = database.Column(database.Integer, database.ForeignKey('forecast_runs.id'), nullable=False)
+    published_at = database.Column(database.DateTime(timezone=True), nullable=False)
+
+
+    def __repr__(self):
+        return f'<CurrentForecastSnapshot {self.run_id}>'
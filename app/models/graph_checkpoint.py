@@ -0,0 +1,56 @@
+from app.extensions import database
+from sqlalchemy.sql import func
+
+# Storage of services/checkpointer.SQLAlchemyCheckpointSaver. A checkpoint row holds the graph's
+# checkpoint without its channel values; each channel value is stored once per version as a blob,
+# so a new checkpoint only writes the channels that changed.
+
+class GraphCheckpoint(database.Model):
+    __tablename__ = "graph_checkpoints"
+
+    thread_id = database.Column(database.String(255), primary_key=True)
+    checkpoint_ns = database.Column(database.String(255), primary_key=True, default='')
+    checkpoint_id = database.Column(database.String(64), primary_key=True)
+    parent_checkpoint_id = database.Column(database.String(64), nullable=True)
+    type = database.Column(database.String(32), nullable=False)
+    checkpoint = database.Column(database.LargeBinary, nullable=False)
+    metadata_type = database.Column(database.String(32), nullable=False)
+    checkpoint_metadata = database.Column(database.LargeBinary, nullable=False)
+    created_at = database.Column(database.DateTime(timezone=True), server_default=func.now())
+
+
+    def __repr__(self):
+        return f'<GraphCheckpoint {self.thread_id} {self.checkpoint_id}>'
+
+
+class GraphCheckpointBlob(database.Model):
+    __tablename__ = "graph_checkpoint_blobs"
+
+    thread_id = database.Column(database.String(255), primary_key=True)
+    checkpoint_ns = database.Column(database.String(255), primary_key=True, default='')
+    channel = database.Column(database.String(255), primary_key=True)
+    version = database.Column(database.String(64), primary_key=True)
+    type = database.Column(database.String(32), nullable=False)
+    blob = database.Column(database.LargeBinary, nullable=True)
+
+
+    def __repr__(self):
+        return f'<GraphCheckpointBlob {self.thread_id} {self.channel} {self.version}>'
+
+
+class GraphCheckpointWrite(database.Model):
+    __tablename__ = "graph_checkpoint_writes"
+
+    thread_id = database.Column(database.String(255), primary_key=True)
+    checkpoint_ns = database.Column(database.String(255), primary_key=True, default='')
+    checkpoint_id = database.Column(database.String(64), primary_key=True)
+    task_id = database.Column(database.String(64), primary_key=True)
+    idx = database.Column(database.Integer, primary_key=True, autoincrement=False)
+    channel = database.Column(database.String(255), nullable=False)
+    type = database.Column(database.String(32), nullable=False)
+    blob = database.Column(database.LargeBinary, nullable=False)
+    task_path = database.Column(database.String(255), nullable=False, default='')
+
+
+    def __repr__(self):
+        return f'<GraphCheckpointWrite {self.thread_id} {self.checkpoint_id} {self.task_id}>'
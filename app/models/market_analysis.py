@@ -0,0 +1,19 @@
+from app.extensions import database
+from sqlalchemy.sql import func
+
+class MarketAnalysis(database.Model):
+    __tablename__ = "market_analyses"
+    __table_args__ = (
+        database.UniqueConstraint('run_id', 'ticker', 'prompt_version'),
+    )
+
+    id = database.Column(database.Integer, primary_key=True)
+    run_id = database.Column(database.Integer, database.ForeignKey('forecast_runs.id', ondelete='CASCADE'), nullable=False)
+    ticker = database.Column(database.String(10), nullable=False)
+    prompt_version = database.Column(database.Integer, nullable=False)
+    analysis = database.Column(database.Text, nullable=False)
+    created_at = database.Column(database.DateTime(timezone=True), server_default=func.now())
+
+
+    def __repr__(self):
+        return f'<MarketAnalysis {self.ticker} run {self.run_id} v{self.prompt_version}>'
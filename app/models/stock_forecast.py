@@ -1,15 +1,20 @@
 from app.extensions import database, session
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-import jsonpickle
+from sqlalchemy.dialects.postgresql import JSONB
 
 class StockForecast(database.Model):
     __tablename__ = "stock_forecasts"
+    __table_args__ = (
+        database.UniqueConstraint('run_id', 'ticker'),
+        database.Index('ix_stock_forecasts_ticker', 'ticker'),
+    )
 
     id = database.Column(database.Integer, primary_key=True)
+    run_id = database.Column(database.Integer, database.ForeignKey('forecast_runs.id', ondelete='CASCADE'), nullable=True)
     ticker = database.Column(database.String(10), nullable=False)
-    retrieved_data = database.Column(database.Text, nullable=False)
-    forecast = database.Column(database.Text, nullable=False)
+    retrieved_data = database.Column(database.JSON().with_variant(JSONB(), 'postgresql'), nullable=False)
+    forecast = database.Column(database.JSON().with_variant(JSONB(), 'postgresql'), nullable=False)
     created_at = database.Column(database.DateTime(timezone=True), server_default=func.now())
 
 
@@ -20,14 +25,8 @@ class StockForecast(database.Model):
     def serialize(self):
         return {
             'id': self.id,
+            'run_id': self.run_id,
             'ticker': self.ticker,
-            "retrieved_data": self.deserialize_data(self.retrieved_data),
-            "forecast": self.deserialize_data(self.forecast)
-        }
-    
-    def deserialize_data(self, data):
-        try:
-            return jsonpickle.decode(data)
-        except Exception as e:
-            print(f"Error decoding data: {e}")
-            return None
+            "retrieved_data": self.retrieved_data,
+            "forecast": self.forecast
+        }
\ No newline at end of file
@@ -0,0 +1,14 @@
+from app.extensions import database
+from sqlalchemy.sql import func
+
+class TrackedTicker(database.Model):
+    __tablename__ = "tracked_tickers"
+
+    id = database.Column(database.Integer, primary_key=True)
+    ticker = database.Column(database.String(10), nullable=False, unique=True)
+    active = database.Column(database.Boolean, nullable=False, default=True, server_default=database.true())
+    created_at = database.Column(database.DateTime(timezone=True), server_default=func.now())
+
+
+    def __repr__(self):
+        return f'<TrackedTicker {self.ticker}>'
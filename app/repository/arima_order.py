@@ -0,0 +1,44 @@
+import logging
+from sqlalchemy.exc import SQLAlchemyError
+from datetime import datetime, timedelta, timezone
+from app.models.arima_order import ArimaOrder
+from app.extensions.database import session
+from app.constants import ARIMA_ORDER_RESEARCH_DAYS
+
+
+def get_cached_orders(tickers):
+    """Returns {ticker: {'order', 'aic'}} for tickers whose order search is still fresh."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=ARIMA_ORDER_RESEARCH_DAYS)
+    records = ArimaOrder.query.filter(ArimaOrder.ticker.in_(list(tickers)), ArimaOrder.searched_at >= cutoff).all()
+    return {record.ticker: {'order': record.order, 'aic': record.aic} for record in records}
+
+def save_orders(results):
+    """
+    Upserts the order of every successful build_arimax_model result. The AIC is only
+    replaced when the order was searched, so it stays the reference later fits are compared to.
+    """
+    now = datetime.now(timezone.utc)
+    records = {record.ticker: record for record in ArimaOrder.query.filter(ArimaOrder.ticker.in_(list(results))).all()}
+
+    for ticker, result in results.items():
+        if result is None:
+            continue
+
+        p, d, q = result['model_info']['arimax_order']
+        record = records.get(ticker)
+        if record is None:
+            record = ArimaOrder(ticker=ticker)
+            session.add(record)
+
+        if record.searched_at is None or result['model_info']['order_searched']:
+            record.p, record.d, record.q = int(p), int(d), int(q)
+            record.aic = float(result['model_info']['aic'])
+            record.searched_at = now
+
+        record.fitted_at = now
+
+    try:
+        session.commit()
+    except SQLAlchemyError as e:
+        session.rollback()
+        logging.error(f"Failed to save ARIMA orders: {e}")
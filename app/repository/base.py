@@ -1,7 +1,9 @@
 from ..extensions.database import session
 from flask import abort
 from sqlalchemy.exc import SQLAlchemyError
+from ..extensions.metrics import time_db_call
 
+@time_db_call
 def get_record_by_field(model, field, value):
     data = session.query(model).filter(getattr(model, field) == value).first()
 
@@ -10,13 +12,16 @@ def get_record_by_field(model, field, value):
 
     return data
 
+@time_db_call
 def get_records_by_field(model, field, value):
     data = session.query(model).filter(getattr(model, field) == value).order_by(getattr(model, "id").desc()).all()
     return data
 
+@time_db_call
 def get_total_records_by_field(model, field, value):
     return session.query(model).filter(getattr(model, field) == value).count()
 
+@time_db_call
 def update_record_field(model, field, value):
     data = session.query(model).update(getattr(model, field) == value).first()
     print(data)
@@ -26,9 +31,11 @@ def update_record_field(model, field, value):
     return data
         
     
+@time_db_call
 def get_list(model):
     return session.query(model).all()
 
+@time_db_call
 def delete_records_by_field(model, field, value):
     try:
         records = session.query(model).filter(getattr(model, field) == value)
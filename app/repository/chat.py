@@ -0,0 +1,29 @@
+from sqlalchemy import or_, and_
+from app.models import Chat
+from app.extensions.metrics import time_db_operation
+
+
+@time_db_operation('get_user_chats_page', 'Chat')
+def get_user_chats_page(user_id, limit, after=None):
+    """
+    Returns a page of a user's chats, most recently active first, through the
+    ix_chats_user_id_last_activity_at index. The graph blob is not loaded.
+
+    Parameters:
+    - user_id: The id of the user.
+    - limit: The maximum number of chats returned.
+    - after: The (last_activity_at, id) of the last chat of the previous page, or None for the first page.
+
+    Returns:
+    - The Chats.
+    """
+    query = Chat.query.filter(Chat.user_id == user_id)
+
+    if after is not None:
+        last_activity_at, chat_id = after
+        query = query.filter(or_(
+            Chat.last_activity_at < last_activity_at,
+            and_(Chat.last_activity_at == last_activity_at, Chat.id < chat_id)
+        ))
+
+    return query.order_by(Chat.last_activity_at.desc(), Chat.id.desc()).limit(limit).all()
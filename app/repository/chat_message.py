@@ -0,0 +1,58 @@
+import logging
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import func
+from app.models import Chat, ChatMessage
+from app.extensions.database import session
+from app.extensions.metrics import time_db_operation
+
+# Attempts to append a turn when another request appended to the same chat concurrently.
+APPEND_ATTEMPTS = 3
+
+
+@time_db_operation('append_messages', 'ChatMessage')
+def append_messages(chat_id, messages):
+    """
+    Appends messages to the end of a chat's log in one transaction, and updates the chat's preview
+    and last activity time.
+
+    Parameters:
+    - chat_id: The id of the chat.
+    - messages: [(role, content)] in order, e.g. [('User', query), ('AI', response)].
+
+    Returns:
+    - The appended ChatMessages.
+    """
+    for attempt in range(APPEND_ATTEMPTS):
+        last_seq = session.query(func.max(ChatMessage.seq)).filter(ChatMessage.chat_id == chat_id).scalar() or 0
+        records = [
+            ChatMessage(chat_id=chat_id, seq=last_seq + index, role=role, content=content)
+            for index, (role, content) in enumerate(messages, start=1)
+        ]
+        try:
+            session.add_all(records)
+            session.query(Chat).filter(Chat.id == chat_id).update(
+                {Chat.preview: Chat.get_preview(messages[-1][1]), Chat.last_activity_at: func.now()},
+                synchronize_session=False
+            )
+            session.commit()
+            return records
+        except IntegrityError:
+            # Another turn took the same seq; retry after it
+            session.rollback()
+            logging.info(f"Retrying append to chat {chat_id} ({attempt + 1}/{APPEND_ATTEMPTS}).")
+
+    raise RuntimeError(f"Could not append messages to chat {chat_id}")
+
+@time_db_operation('get_messages', 'ChatMessage')
+def get_messages(chat_id, after_seq=0, limit=50):
+    """Returns up to limit messages of a chat with a seq above after_seq, oldest first."""
+    return ChatMessage.query.filter(
+        ChatMessage.chat_id == chat_id,
+        ChatMessage.seq > after_seq
+    ).order_by(ChatMessage.seq).limit(limit).all()
+
+@time_db_operation('get_latest_messages', 'ChatMessage')
+def get_latest_messages(chat_id, limit=50):
+    """Returns the last limit messages of a chat, oldest first."""
+    records = ChatMessage.query.filter(ChatMessage.chat_id == chat_id).order_by(ChatMessage.seq.desc()).limit(limit).all()
+    return records[::-1]
@@ -0,0 +1,215 @@
+import logging
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import Integer, select, insert, literal
+from sqlalchemy.sql import func
+from datetime import datetime, timedelta, timezone
+from app.models import TrackedTicker, ForecastRun, ForecastProgress, StockForecast, CurrentForecastSnapshot, MarketAnalysis
+from app.extensions.database import session
+from app.enums import ForecastRunStatus, ForecastTickerStatus
+from app.constants import FORECAST_RUN_RESUME_HOURS
+
+# Primary key of the only row of current_forecast_snapshot.
+CURRENT_SNAPSHOT_ID = 1
+
+
+def get_tracked_tickers():
+    """Returns the active tickers of the tracked_tickers table, in alphabetical order."""
+    records = TrackedTicker.query.filter_by(active=True).order_by(TrackedTicker.ticker).all()
+    return [record.ticker for record in records]
+
+def start_or_resume_run(tickers, shard_size):
+    """
+    Returns the run the forecast job should work on: the latest unfinished run if it started
+    less than FORECAST_RUN_RESUME_HOURS ago, otherwise a new run over tickers, split into shards
+    of shard_size with one pending progress row per ticker. Older unfinished runs are abandoned.
+    """
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(hours=FORECAST_RUN_RESUME_HOURS)
+
+    run = ForecastRun.query.filter(
+        ForecastRun.status == ForecastRunStatus.RUNNING.value,
+        ForecastRun.started_at >= cutoff
+    ).order_by(ForecastRun.started_at.desc()).first()
+
+    stale_runs = ForecastRun.query.filter(ForecastRun.status == ForecastRunStatus.RUNNING.value)
+    if run is not None:
+        stale_runs = stale_runs.filter(ForecastRun.id != run.id)
+    stale_runs.update({'status': ForecastRunStatus.ABANDONED.value, 'finished_at': now}, synchronize_session=False)
+
+    if run is not None:
+        session.commit()
+        logging.info(f"Resuming forecast run {run.id}.")
+        return run
+
+    tickers = list(dict.fromkeys(tickers))
+    shard_size = max(1, shard_size)
+    run = ForecastRun(
+        status=ForecastRunStatus.RUNNING.value,
+        ticker_count=len(tickers),
+        shard_size=shard_size,
+        started_at=now
+    )
+    run.progress = [
+        ForecastProgress(ticker=ticker, shard=index // shard_size, status=ForecastTickerStatus.PENDING.value)
+        for index, ticker in enumerate(tickers)
+    ]
+    session.add(run)
+    session.commit()
+
+    logging.info(f"Started forecast run {run.id} for {len(tickers)} tickers in shards of {shard_size}.")
+    return run
+
+def get_pending_shards(run):
+    """Returns [(shard, tickers)] for the shards of a run that still have pending tickers, in shard order."""
+    rows = session.query(ForecastProgress.shard, ForecastProgress.ticker).filter(
+        ForecastProgress.run_id == run.id,
+        ForecastProgress.status == ForecastTickerStatus.PENDING.value
+    ).order_by(ForecastProgress.shard, ForecastProgress.id).all()
+
+    shards = {}
+    for shard, ticker in rows:
+        shards.setdefault(shard, []).append(ticker)
+    return list(shards.items())
+
+def save_shard_results(run, forecasts, failures):
+    """
+    Stores the forecasts of a shard in the run's snapshot and records its tickers as done or failed
+    in the same transaction, so a ticker is never marked done without its forecast being stored.
+
+    Parameters:
+    - run: The ForecastRun being processed.
+    - forecasts: {ticker: {'retrieved_data', 'forecast'}} for the tickers that succeeded.
+    - failures: {ticker: error message} for the tickers that failed.
+
+    Returns:
+    - True if the shard was saved. On failure the tickers stay pending and are retried on resume.
+    """
+    try:
+        StockForecast.query.filter(
+            StockForecast.run_id == run.id,
+            StockForecast.ticker.in_(list(forecasts))
+        ).delete(synchronize_session=False)
+
+        session.add_all([
+            StockForecast(
+                run_id=run.id,
+                ticker=ticker,
+                retrieved_data=payload['retrieved_data'],
+                forecast=payload['forecast']
+            )
+            for ticker, payload in forecasts.items()
+        ])
+
+        progress = ForecastProgress.query.filter(
+            ForecastProgress.run_id == run.id,
+            ForecastProgress.ticker.in_(list(forecasts) + list(failures))
+        ).all()
+
+        for row in progress:
+            if row.ticker in forecasts:
+                row.status = ForecastTickerStatus.DONE.value
+                row.error = None
+            else:
+                row.status = ForecastTickerStatus.FAILED.value
+                row.error = failures[row.ticker]
+
+        session.commit()
+        return True
+    except SQLAlchemyError as e:
+        session.rollback()
+        logging.error(f"Failed to save forecast shard of run {run.id}: {e}")
+        return False
+
+def get_current_snapshot_id():
+    """Returns the id of the run whose forecasts are currently served, or None before the first publish."""
+    current = session.get(CurrentForecastSnapshot, CURRENT_SNAPSHOT_ID)
+    return current.run_id if current else None
+
+def current_snapshot_filter(run_id):
+    # Before the first publish, the rows written without a run are the snapshot.
+    return StockForecast.run_id == run_id if run_id is not None else StockForecast.run_id.is_(None)
+
+def complete_run(run):
+    """
+    Publishes a run once it has no pending tickers. In a single transaction, the forecasts of
+    tickers that failed in this run are carried forward from the current snapshot and the current
+    snapshot pointer is moved to the run, so readers switch from the old snapshot to the complete
+    new one at once. Returns {status: ticker count}.
+    """
+    counts = dict(session.query(ForecastProgress.status, func.count(ForecastProgress.id)).filter(
+        ForecastProgress.run_id == run.id
+    ).group_by(ForecastProgress.status).all())
+
+    if counts.get(ForecastTickerStatus.PENDING.value):
+        return counts
+
+    try:
+        now = datetime.now(timezone.utc)
+        current = session.get(CurrentForecastSnapshot, CURRENT_SNAPSHOT_ID)
+
+        failed_tickers = session.query(ForecastProgress.ticker).filter(
+            ForecastProgress.run_id == run.id,
+            ForecastProgress.status == ForecastTickerStatus.FAILED.value
+        )
+        carried_forward = select(
+            literal(run.id, Integer), StockForecast.ticker, StockForecast.retrieved_data, StockForecast.forecast
+        ).where(
+            current_snapshot_filter(current.run_id if current else None),
+            StockForecast.ticker.in_(failed_tickers)
+        )
+        session.execute(insert(StockForecast).from_select(['run_id', 'ticker', 'retrieved_data', 'forecast'], carried_forward))
+
+        if current is None:
+            current = CurrentForecastSnapshot(id=CURRENT_SNAPSHOT_ID)
+            session.add(current)
+        current.run_id = run.id
+        current.published_at = now
+
+        run.status = ForecastRunStatus.COMPLETED.value
+        run.finished_at = now
+        session.commit()
+        logging.info(f"Published forecast run {run.id}.")
+    except SQLAlchemyError as e:
+        session.rollback()
+        logging.error(f"Failed to publish forecast run {run.id}: {e}")
+
+    return counts
+
+def prune_snapshots(retention):
+    """
+    Deletes the forecasts, market analyses and progress of finished runs, other than the current
+    snapshot and the retention most recent completed runs. Runs are deleted one per transaction to
+    keep each delete short next to live traffic. Rows written before snapshots existed go once a run is published.
+
+    Returns:
+    - The number of runs deleted.
+    """
+    current_id = get_current_snapshot_id()
+    if current_id is None:
+        return 0
+
+    kept = [run_id for (run_id,) in session.query(ForecastRun.id).filter(
+        ForecastRun.status == ForecastRunStatus.COMPLETED.value
+    ).order_by(ForecastRun.id.desc()).limit(retention).all()]
+    kept.append(current_id)
+
+    stale_run_ids = [run_id for (run_id,) in session.query(ForecastRun.id).filter(
+        ForecastRun.status != ForecastRunStatus.RUNNING.value,
+        ForecastRun.id.notin_(kept)
+    ).order_by(ForecastRun.id).all()]
+
+    try:
+        StockForecast.query.filter(StockForecast.run_id.is_(None)).delete(synchronize_session=False)
+        session.commit()
+
+        for run_id in stale_run_ids:
+            StockForecast.query.filter(StockForecast.run_id == run_id).delete(synchronize_session=False)
+            MarketAnalysis.query.filter(MarketAnalysis.run_id == run_id).delete(synchronize_session=False)
+            ForecastProgress.query.filter(ForecastProgress.run_id == run_id).delete(synchronize_session=False)
+            ForecastRun.query.filter(ForecastRun.id == run_id).delete(synchronize_session=False)
+            session.commit()
+    except SQLAlchemyError as e:
+        session.rollback()
+        logging.error(f"Failed to prune forecast snapshots: {e}")
+
+    return len(stale_run_ids)
@@ -0,0 +1,34 @@
+import logging
+from sqlalchemy.exc import SQLAlchemyError
+from app.models import MarketAnalysis
+from app.extensions.database import session
+from app.extensions.metrics import time_db_operation
+
+
+@time_db_operation('get_market_analysis', 'MarketAnalysis')
+def get_market_analysis(run_id, ticker, prompt_version):
+    """Returns the stored analysis of a ticker for a forecast snapshot and prompt version, or None."""
+    record = MarketAnalysis.query.filter_by(run_id=run_id, ticker=ticker, prompt_version=prompt_version).first()
+    return record.analysis if record else None
+
+def get_analysed_tickers(run_id, prompt_version):
+    """Returns the set of tickers that already have an analysis for a forecast snapshot and prompt version."""
+    rows = session.query(MarketAnalysis.ticker).filter_by(run_id=run_id, prompt_version=prompt_version).all()
+    return {ticker for (ticker,) in rows}
+
+def save_market_analysis(run_id, ticker, prompt_version, analysis):
+    """
+    Stores the analysis of a ticker. If another worker stored one for the same snapshot and
+    prompt version first, that one is kept.
+
+    Returns:
+    - True if the analysis was saved.
+    """
+    try:
+        session.add(MarketAnalysis(run_id=run_id, ticker=ticker, prompt_version=prompt_version, analysis=analysis))
+        session.commit()
+        return True
+    except SQLAlchemyError as e:
+        session.rollback()
+        logging.info(f"Market analysis of {ticker} for run {run_id} not saved: {e}")
+        return False
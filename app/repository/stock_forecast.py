@@ -0,0 +1,22 @@
+from flask import abort
+from app.models import StockForecast
+from app.repository.forecast_run import get_current_snapshot_id, current_snapshot_filter
+from app.extensions.metrics import time_db_operation
+
+
+@time_db_operation('get_current_forecast', 'StockForecast')
+def get_current_forecast(ticker):
+    """Returns the ticker's StockForecast from the published snapshot, or aborts with 404."""
+    record = StockForecast.query.filter(
+        StockForecast.ticker == ticker,
+        current_snapshot_filter(get_current_snapshot_id())
+    ).order_by(StockForecast.id.desc()).first()
+
+    if record is None:
+        abort(404, "StockForecast not found")
+
+    return record
+
+def get_snapshot_forecasts(run_id):
+    """Returns the StockForecasts of a snapshot, in ticker order."""
+    return StockForecast.query.filter(StockForecast.run_id == run_id).order_by(StockForecast.ticker).all()
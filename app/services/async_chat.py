@@ -0,0 +1,137 @@
+from ..constants import *
+from ..repository import base
+from ..models import Chat
+from ..helpers import format_event
+import asyncio
+import logging
+from langchain_core.messages import HumanMessage
+from .graph import get_graph
+from .chat import (
+    STREAMED_NODES, create_chat, delete_chat, save_analysis, save_follow_up, format_price_series, get_graph_configuration
+)
+
+# Async variants of the chat services, served by asgi.py. The graph runs through ainvoke/astream with
+# the async LLM clients, so a conversation waiting on the model does not hold a thread. Database calls
+# stay synchronous and run in a worker thread; they must be awaited within an app context.
+
+async def start_chat(request):
+    stock = request.get('stock')
+    user_id = request.get("user_id")
+    graph_input = {'messages' : [HumanMessage(content=f"{stock}")]}
+
+    if not user_id:
+        state = await get_graph(persistent=False).ainvoke(graph_input)
+        return {"analysis": state['messages'][-1].content}
+
+    chat = await asyncio.to_thread(create_chat, user_id, stock)
+
+    try:
+        state = await get_graph().ainvoke(graph_input, get_graph_configuration(chat.id))
+    except Exception:
+        await asyncio.to_thread(delete_chat, chat)
+        raise
+
+    analysis = state['messages'][-1].content
+
+    await asyncio.to_thread(save_analysis, chat, analysis)
+    return {"analysis": analysis, "chat_id": chat.id, **format_price_series(state, request.get('series_format'))}
+
+async def continue_chat(request):
+    query = request.get('query')
+    chat_id = request.get("chat_id")
+
+    chat = await asyncio.to_thread(base.get_record_by_field, Chat, "id", chat_id)
+
+    state = await get_graph().ainvoke({'messages' : [HumanMessage(content=query)], 'follow_up': query, 'end_chat': False}, get_graph_configuration(chat.id))
+
+    response = state['messages'][-2].content
+
+    updated_memory = await asyncio.to_thread(save_follow_up, chat, query, response)
+
+    return {"response": response, "chat_history": updated_memory}
+
+async def stream_start_chat(request):
+    """Async variant of chat.stream_start_chat, sending the same events."""
+    stock = request.get('stock')
+    user_id = request.get("user_id")
+    graph_input = {'messages' : [HumanMessage(content=f"{stock}")]}
+
+    if not user_id:
+        async def anonymous_events():
+            result = {}
+            try:
+                async for event in stream_graph(get_graph(persistent=False), graph_input, None, result, request.get('series_format')):
+                    yield event
+            except Exception as e:
+                logging.exception(f"Streaming chat for {stock} failed: {e}")
+                yield format_event('error', {'message': INTERNAL_SERVER_ERROR_MESSAGE})
+                return
+
+            yield format_event('done', {'analysis': result['state']['messages'][-1].content})
+
+        return anonymous_events()
+
+    chat = await asyncio.to_thread(create_chat, user_id, stock)
+
+    async def events():
+        result = {}
+        try:
+            async for event in stream_graph(get_graph(), graph_input, get_graph_configuration(chat.id), result, request.get('series_format')):
+                yield event
+            analysis = result['state']['messages'][-1].content
+            await asyncio.to_thread(save_analysis, chat, analysis)
+        except (Exception, asyncio.CancelledError, GeneratorExit) as e:
+            # The chat is dropped when the analysis fails or the client goes away before it is complete
+            await asyncio.shield(asyncio.to_thread(delete_chat, chat))
+            if not isinstance(e, Exception):
+                raise
+            logging.exception(f"Streaming chat {chat.id} failed: {e}")
+            yield format_event('error', {'message': INTERNAL_SERVER_ERROR_MESSAGE})
+            return
+
+        yield format_event('done', {'analysis': analysis, 'chat_id': chat.id})
+
+    return events()
+
+async def stream_continue_chat(request):
+    """Async variant of chat.stream_continue_chat, sending the same events."""
+    query = request.get('query')
+    chat_id = request.get("chat_id")
+
+    chat = await asyncio.to_thread(base.get_record_by_field, Chat, "id", chat_id)
+    graph_input = {'messages' : [HumanMessage(content=query)], 'follow_up': query, 'end_chat': False}
+
+    async def events():
+        result = {}
+        try:
+            async for event in stream_graph(get_graph(), graph_input, get_graph_configuration(chat.id), result, stream_prices=False):
+                yield event
+            response = result['state']['messages'][-2].content
+            updated_memory = await asyncio.to_thread(save_follow_up, chat, query, response)
+        except Exception as e:
+            logging.exception(f"Streaming chat {chat.id} failed: {e}")
+            yield format_event('error', {'message': INTERNAL_SERVER_ERROR_MESSAGE})
+            return
+
+        yield format_event('done', {'response': response, 'chat_history': updated_memory})
+
+    return events()
+
+async def stream_graph(graph, graph_input, config, result, series_format=None, stream_prices=True):
+    """
+    Async variant of chat.stream_graph. Async generators cannot return a value,
+    so the final state of the graph is stored in result['state'].
+    """
+    prices_sent = not stream_prices
+
+    async for mode, chunk in graph.astream(graph_input, config, stream_mode=["values", "messages"]):
+        if mode == "messages":
+            message, metadata = chunk
+            if metadata.get('langgraph_node') in STREAMED_NODES and message.content:
+                yield format_event('token', {'content': message.content})
+            continue
+
+        result['state'] = chunk
+        if not prices_sent and chunk.get('stock_prices') is not None:
+            prices_sent = True
+            yield format_event('prices', format_price_series(chunk, series_format))
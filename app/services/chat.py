@@ -1,39 +1,65 @@
 
 from ..constants import *
 from ..repository import base
-from ..models import User, Chat
-from ..helpers import add_record_to_database
-import zlib
-import jsonpickle
+from ..models import User, Chat, ChatMessage
+from ..repository.chat_message import append_messages, get_messages, get_latest_messages
+from ..repository.chat import get_user_chats_page
+from ..helpers import format_event
+from ..extensions import session
+from flask import abort
+from datetime import datetime
+import base64
+import logging
 from langchain_core.messages import HumanMessage
-from langgraph.graph.state import CompiledStateGraph 
 from .graph import get_graph
-
-def get_user_chats(id: int):
-    chats = base.get_records_by_field(Chat, "user_id", id)
-    return {'chats' : [chat.serialize_without_graph() for chat in chats]}
+from .price_series import expand_price_series, compact_price_series
+
+# Nodes whose model output is streamed to the client token by token
+STREAMED_NODES = ('market_analyser', 'follow_up_chatbot')
+
+def get_user_chats(id: int, cursor: str = None, limit: int = CHAT_LIST_PAGE_SIZE):
+    """
+    Returns a page of a user's chats, most recently active first, with their title, latest message
+    preview and last activity time. next_cursor is the cursor of the next page, or None on the last page.
+    """
+    chats = get_user_chats_page(id, limit, decode_chats_cursor(cursor) if cursor else None)
+
+    return {
+        'chats': [chat.serialize_summary() for chat in chats],
+        'next_cursor': encode_chats_cursor(chats[-1]) if len(chats) == limit else None
+    }
+
+def encode_chats_cursor(chat):
+    return base64.urlsafe_b64encode(f"{chat.last_activity_at.isoformat()}|{chat.id}".encode()).decode()
+
+def decode_chats_cursor(cursor):
+    """Returns the (last_activity_at, id) of the chat a cursor points after."""
+    try:
+        last_activity_at, chat_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(last_activity_at), int(chat_id)
+    except ValueError:
+        abort(400, "Invalid cursor")
 
 def start_chat(request):
     stock = request.get('stock')
     user_id = request.get("user_id")
 
-    graph = get_graph()
-
-    state = graph.invoke({'messages' : [HumanMessage(content=f"{stock}")]})
+    if not user_id:
+        state = get_graph(persistent=False).invoke({'messages' : [HumanMessage(content=f"{stock}")]})
+        return {"analysis": state['messages'][-1].content}
 
-    analysis = state['messages'][-1].content
+    chat = create_chat(user_id, stock)
 
-    # c = compress_data(graph)
-    # print(compress_data(c))
-    # e = jsonpickle.decode(zlib.decompress(c).decode("utf-8"))
-    # print(type(e))
+    try:
+        state = get_graph().invoke({'messages' : [HumanMessage(content=f"{stock}")]}, get_graph_configuration(chat.id))
+    except Exception:
+        delete_chat(chat)
+        raise
 
-    if user_id:
-        chat = Chat(user_id=user_id, title=stock, graph=compress_data(graph), memory=compress_data([{'AI': analysis}]))
-        add_record_to_database(chat)
-        return {"analysis": analysis, "chat_id": chat.id, "predicted_prices": state['predicted_prices'], "stock_prices":state['stock_prices'] }
+    analysis = state['messages'][-1].content
 
-    return {"analysis": analysis}
+    save_analysis(chat, analysis)
+    return {"analysis": analysis, "chat_id": chat.id, **format_price_series(state, request.get('series_format'))}
 
    
 def continue_chat(request):
@@ -42,28 +68,168 @@ def continue_chat(request):
 
     chat = base.get_record_by_field(Chat, "id", chat_id)
 
-    serialized_chat = chat.serialize()
+    # Earlier turns are restored from the chat's checkpoints
+    state = get_graph().invoke({'messages' : [HumanMessage(content=query)], 'follow_up': query, 'end_chat': False}, get_graph_configuration(chat.id))
 
-    graph = serialized_chat['graph']
+    response = state['messages'][-2].content
 
-    state = graph.invoke({'messages' : [HumanMessage(content=query)], 'follow_up': query, 'end_chat': False})
+    updated_memory = save_follow_up(chat, query, response)
 
-    response = state['messages'][-2].content
+    return{"response": response, "chat_history": updated_memory}
 
-    updated_memory = serialized_chat['memory'].append([{'User': query}, {'AI': response}])
 
-    chat.update_memory(updated_memory)
-    chat.update_graph(graph)
+def stream_start_chat(request):
+    """
+    Streaming variant of start_chat, returning a generator of Server-Sent Events:
+    a "prices" event with the stored stock and predicted prices as soon as they are looked up,
+    "token" events with the analysis as it is generated, and a "done" event with the full
+    analysis and chat id once the chat is saved. A failure ends the stream with an "error" event.
+    """
+    stock = request.get('stock')
+    user_id = request.get("user_id")
+    graph_input = {'messages' : [HumanMessage(content=f"{stock}")]}
+
+    if not user_id:
+        def anonymous_events():
+            try:
+                state = yield from stream_graph(get_graph(persistent=False), graph_input, None, request.get('series_format'))
+            except Exception as e:
+                logging.exception(f"Streaming chat for {stock} failed: {e}")
+                yield format_event('error', {'message': INTERNAL_SERVER_ERROR_MESSAGE})
+                return
+
+            yield format_event('done', {'analysis': state['messages'][-1].content})
+
+        return anonymous_events()
+
+    # The chat is created before the stream is opened, so a missing user gets a 404 response
+    # (see create_chat) rather than a stream
+    chat = create_chat(user_id, stock)
+
+    def events():
+        try:
+            state = yield from stream_graph(get_graph(), graph_input, get_graph_configuration(chat.id), request.get('series_format'))
+            analysis = state['messages'][-1].content
+            save_analysis(chat, analysis)
+        except GeneratorExit:
+            # The client went away before the analysis was complete
+            delete_chat(chat)
+            raise
+        except Exception as e:
+            logging.exception(f"Streaming chat {chat.id} failed: {e}")
+            delete_chat(chat)
+            yield format_event('error', {'message': INTERNAL_SERVER_ERROR_MESSAGE})
+            return
+
+        yield format_event('done', {'analysis': analysis, 'chat_id': chat.id})
+
+    return events()
+
+def stream_continue_chat(request):
+    """
+    Streaming variant of continue_chat, returning a generator of Server-Sent Events:
+    "token" events with the response as it is generated, then a "done" event with the full
+    response and chat history once the chat is saved. A failure ends the stream with an "error" event.
+    """
+    query = request.get('query')
+    chat_id = request.get("chat_id")
 
-    return{"response": response, "chat_history": updated_memory}
-    
+    # The chat is looked up before the stream is opened, so a missing one gets a 404 response
+    chat = base.get_record_by_field(Chat, "id", chat_id)
+    graph_input = {'messages' : [HumanMessage(content=query)], 'follow_up': query, 'end_chat': False}
+
+    def events():
+        try:
+            state = yield from stream_graph(get_graph(), graph_input, get_graph_configuration(chat.id), stream_prices=False)
+            response = state['messages'][-2].content
+            updated_memory = save_follow_up(chat, query, response)
+        except Exception as e:
+            logging.exception(f"Streaming chat {chat.id} failed: {e}")
+            yield format_event('error', {'message': INTERNAL_SERVER_ERROR_MESSAGE})
+            return
+
+        yield format_event('done', {'response': response, 'chat_history': updated_memory})
+
+    return events()
+
+def stream_graph(graph, graph_input, config, series_format=None, stream_prices=True):
+    """
+    Runs the graph, yielding Server-Sent Events for the price series (once the stock_forecaster tool
+    has stored them in the state) and for the tokens of the nodes in STREAMED_NODES.
+
+    Returns:
+        dict: The final state of the graph.
+    """
+    state = None
+    prices_sent = not stream_prices
+
+    for mode, chunk in graph.stream(graph_input, config, stream_mode=["values", "messages"]):
+        if mode == "messages":
+            message, metadata = chunk
+            if metadata.get('langgraph_node') in STREAMED_NODES and message.content:
+                yield format_event('token', {'content': message.content})
+            continue
+
+        state = chunk
+        if not prices_sent and state.get('stock_prices') is not None:
+            prices_sent = True
+            yield format_event('prices', format_price_series(state, series_format))
+
+    return state
+
+def create_chat(user_id, stock):
+    # The chat is created first so its id can key the conversation's checkpoints. A missing user
+    # fails with a 404 here, before the graph runs.
+    base.get_record_by_field(User, "id", user_id)
+
+    chat = Chat(user_id=user_id, title=stock)
+    session.add(chat)
+    session.commit()
+    return chat
+
+def save_analysis(chat, analysis):
+    append_messages(chat.id, [('AI', analysis)])
+
+def save_follow_up(chat, query, response):
+    """Appends a follow-up turn to the chat's messages. Returns the latest page of the chat history."""
+    append_messages(chat.id, [('User', query), ('AI', response)])
+
+    return [{message.role: message.content} for message in get_latest_messages(chat.id, CHAT_HISTORY_PAGE_SIZE)]
+
+def get_chat_messages(chat_id: int, after_seq: int = 0, limit: int = CHAT_HISTORY_PAGE_SIZE):
+    """
+    Returns a page of a chat's messages, oldest first, starting after the message numbered after_seq.
+    next_after_seq is the after_seq of the next page, or None on the last page.
+    """
+    chat = base.get_record_by_field(Chat, "id", chat_id)
+    messages = get_messages(chat.id, after_seq, limit)
+
+    return {
+        'messages': [message.serialize() for message in messages],
+        'next_after_seq': messages[-1].seq if len(messages) == limit else None
+    }
+
+def delete_chat(chat):
+    get_graph().checkpointer.delete_thread(chat.id)
+    ChatMessage.query.filter(ChatMessage.chat_id == chat.id).delete(synchronize_session=False)
+    session.delete(chat)
+    session.commit()
+
+def format_price_series(state, series_format=None):
+    """Returns the chat's price series as stored (columnar), or as the legacy {"date", "price"} rows."""
+    if series_format == 'rows':
+        convert = expand_price_series
+    else:
+        convert = compact_price_series
+
+    return {"predicted_prices": convert(state['predicted_prices']), "stock_prices": convert(state['stock_prices'])}
 
 def get_graph_configuration(thread_id: int):
+    if thread_id is None:
+        # Checkpoints of every chat that failed to save would share the thread "None"
+        raise ValueError("A graph thread needs the id of a saved chat")
     return {"configurable": {"thread_id": f"{thread_id}"}}
 
-def compress_data(data):
-    string_data = jsonpickle.encode(data).encode()
-    return zlib.compress(string_data)
     
     
 
@@ -0,0 +1,111 @@
+import logging
+from langchain_core.messages import SystemMessage, RemoveMessage
+from ..constants import CHAT_CONTEXT_TURNS, CHAT_SUMMARY_BATCH_TURNS, CHAT_SUMMARY_MAX_TOKENS
+from ..extensions.metrics import CHAT_CONTEXT_TOKENS
+from .prompt_context import estimate_tokens
+from .prompt_templates import get_summary_template
+from .llm import get_llm
+
+# The prompts of a conversation get a running summary of its older turns and the recent turns
+# verbatim, so their size stays bounded however long the conversation gets. A turn starts at a
+# user message and holds everything up to the next one (tool calls, tool results, answers), so a
+# tool call is never separated from its result.
+#
+# The last CHAT_CONTEXT_TURNS turns are kept verbatim. Older turns stay in the state until
+# CHAT_SUMMARY_BATCH_TURNS of them have piled up, and are then folded into the summary and removed
+# in a single LLM call, so the cost of summarising is paid once every CHAT_SUMMARY_BATCH_TURNS turns.
+KEPT_TURNS = max(1, CHAT_CONTEXT_TURNS)
+MAX_TURNS = KEPT_TURNS + max(1, CHAT_SUMMARY_BATCH_TURNS)
+
+ROLES = {'human': 'User', 'ai': 'AI'}
+
+
+def get_turn_starts(messages):
+    """Returns the index of the first message of every turn of messages."""
+    starts = [index for index, message in enumerate(messages) if message.type == 'human']
+    if messages and (not starts or starts[0] != 0):
+        starts.insert(0, 0)
+    return starts
+
+def get_context_messages(state):
+    """Returns the messages of the last MAX_TURNS turns, those not folded into the summary yet."""
+    messages = state['messages']
+    starts = get_turn_starts(messages)
+    if len(starts) <= MAX_TURNS:
+        return list(messages)
+    return messages[starts[-MAX_TURNS]:]
+
+def get_chatbot_messages(state):
+    """Returns the messages sent to the tool calling LLM: the summary, if any, then the recent turns."""
+    messages = get_context_messages(state)
+    if state.get('summary'):
+        return [SystemMessage(content=f"Summary of the earlier conversation: {state['summary']}"), *messages]
+    return messages
+
+def format_transcript(messages):
+    """Returns the user and AI messages as 'User: ...' and 'AI: ...' lines. Tool calls and results are left out."""
+    return "\n".join(
+        f"{ROLES[message.type]}: {message.content}"
+        for message in messages if message.type in ROLES and message.content
+    )
+
+def get_follow_up_context(state):
+    """Returns the summary and chat_history inputs of the follow up prompt."""
+    context = {
+        'summary': state.get('summary') or 'None',
+        'chat_history': format_transcript(get_context_messages(state))
+    }
+    CHAT_CONTEXT_TOKENS.observe(estimate_tokens(context['summary']) + estimate_tokens(context['chat_history']))
+    return context
+
+def needs_summary(state):
+    return len(get_turn_starts(state['messages'])) >= MAX_TURNS
+
+def get_folded_messages(state):
+    """Returns the messages of every turn before the last KEPT_TURNS."""
+    messages = state['messages']
+    starts = get_turn_starts(messages)
+    return messages[:starts[-KEPT_TURNS]] if len(starts) > KEPT_TURNS else []
+
+def get_summary_chain():
+    return get_summary_template() | get_llm().bind(max_tokens=CHAT_SUMMARY_MAX_TOKENS)
+
+def get_summary_input(state, folded):
+    return {'summary': state.get('summary') or 'None', 'messages': format_transcript(folded)}
+
+def get_summary_update(summary, folded):
+    return {'summary': summary, 'messages': [RemoveMessage(id=message.id) for message in folded]}
+
+def summarize_conversation(state):
+    """
+    Folds the turns before the last KEPT_TURNS into the summary and removes them from the state.
+    If the LLM call fails the state is left as is, and the turns are folded after the next turn.
+
+    Returns:
+        dict: The state update.
+    """
+    folded = get_folded_messages(state)
+    if not folded:
+        return {}
+
+    try:
+        response = get_summary_chain().invoke(get_summary_input(state, folded))
+    except Exception as e:
+        logging.warning(f"Summarising the conversation failed: {e}")
+        return {}
+
+    return get_summary_update(response.content, folded)
+
+async def asummarize_conversation(state):
+    """Async variant of summarize_conversation."""
+    folded = get_folded_messages(state)
+    if not folded:
+        return {}
+
+    try:
+        response = await get_summary_chain().ainvoke(get_summary_input(state, folded))
+    except Exception as e:
+        logging.warning(f"Summarising the conversation failed: {e}")
+        return {}
+
+    return get_summary_update(response.content, folded)
@@ -0,0 +1,352 @@
+import random
+import asyncio
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence
+from sqlalchemy import select, delete, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver, ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple,
+    WRITES_IDX_MAP, get_checkpoint_id, get_checkpoint_metadata
+)
+from langgraph.checkpoint.serde.types import TASKS
+from app.models import GraphCheckpoint, GraphCheckpointBlob, GraphCheckpointWrite
+from app.constants import CHAT_CHECKPOINTS_KEPT
+
+checkpoints_table = GraphCheckpoint.__table__
+blobs_table = GraphCheckpointBlob.__table__
+writes_table = GraphCheckpointWrite.__table__
+
+DIALECT_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert
+}
+
+
+class SQLAlchemyCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    LangGraph checkpointer storing conversation state in the application database
+    (tables graph_checkpoints, graph_checkpoint_blobs and graph_checkpoint_writes).
+
+    Each call runs its own short transaction on a connection from the engine's pool rather than
+    the Flask-SQLAlchemy session, so the saver can be shared by every request and thread of
+    a worker. Only channels whose version changed are written with a new checkpoint.
+
+    Only the last `keep` checkpoints of a thread are kept: each put deletes the older ones, their
+    writes and the blobs no kept checkpoint refers to, so a conversation's storage does not grow
+    with every step. The parent of the latest checkpoint is kept as well (keep is at least 2),
+    since its writes are replayed into the latest one.
+    """
+
+    def __init__(self, engine, *, serde=None, keep=CHAT_CHECKPOINTS_KEPT):
+        super().__init__(serde=serde)
+        self.engine = engine
+        self.keep = max(2, keep)
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+
+        query = select(checkpoints_table).where(checkpoints_table.c.thread_id == thread_id, checkpoints_table.c.checkpoint_ns == checkpoint_ns)
+        if checkpoint_id := get_checkpoint_id(config):
+            query = query.where(checkpoints_table.c.checkpoint_id == checkpoint_id)
+        else:
+            query = query.order_by(checkpoints_table.c.checkpoint_id.desc()).limit(1)
+
+        with self.engine.connect() as connection:
+            row = connection.execute(query).first()
+            if row is None:
+                return None
+            return self.load_tuple(connection, row)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = select(checkpoints_table).order_by(checkpoints_table.c.thread_id, checkpoints_table.c.checkpoint_id.desc())
+        if config:
+            query = query.where(checkpoints_table.c.thread_id == config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                query = query.where(checkpoints_table.c.checkpoint_ns == checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                query = query.where(checkpoints_table.c.checkpoint_id == checkpoint_id)
+        if before and (before_checkpoint_id := get_checkpoint_id(before)):
+            query = query.where(checkpoints_table.c.checkpoint_id < before_checkpoint_id)
+        # Metadata is filtered after decoding, so the limit can only go into the query without a filter.
+        if limit is not None and not filter:
+            query = query.limit(limit)
+
+        with self.engine.connect() as connection:
+            rows = connection.execute(query).all()
+
+            for row in rows:
+                if limit is not None and limit <= 0:
+                    break
+
+                metadata = self.serde.loads_typed((row.metadata_type, row.checkpoint_metadata))
+                if filter and not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+
+                if limit is not None:
+                    limit -= 1
+                yield self.load_tuple(connection, row, metadata)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+
+        stored = checkpoint.copy()
+        stored.pop("pending_sends", None)
+        values = stored.pop("channel_values")
+
+        blob_rows = []
+        for channel, version in new_versions.items():
+            blob_type, blob = self.serde.dumps_typed(values[channel]) if channel in values else ("empty", None)
+            blob_rows.append({
+                'thread_id': thread_id,
+                'checkpoint_ns': checkpoint_ns,
+                'channel': channel,
+                'version': str(version),
+                'type': blob_type,
+                'blob': blob
+            })
+
+        checkpoint_type, checkpoint_data = self.serde.dumps_typed(stored)
+        metadata_type, metadata_data = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        checkpoint_row = {
+            'thread_id': thread_id,
+            'checkpoint_ns': checkpoint_ns,
+            'checkpoint_id': checkpoint["id"],
+            'parent_checkpoint_id': config["configurable"].get("checkpoint_id"),
+            'type': checkpoint_type,
+            'checkpoint': checkpoint_data,
+            'metadata_type': metadata_type,
+            'checkpoint_metadata': metadata_data
+        }
+
+        with self.engine.begin() as connection:
+            if blob_rows:
+                self.insert(connection, blobs_table, blob_rows, ['thread_id', 'checkpoint_ns', 'channel', 'version'])
+            self.insert(connection, checkpoints_table, [checkpoint_row], ['thread_id', 'checkpoint_ns', 'checkpoint_id'], update=True)
+            self.prune(connection, thread_id, checkpoint_ns)
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            value_type, blob = self.serde.dumps_typed(value)
+            rows.append({
+                'thread_id': thread_id,
+                'checkpoint_ns': checkpoint_ns,
+                'checkpoint_id': checkpoint_id,
+                'task_id': task_id,
+                'idx': WRITES_IDX_MAP.get(channel, idx),
+                'channel': channel,
+                'type': value_type,
+                'blob': blob,
+                'task_path': task_path
+            })
+
+        if not rows:
+            return
+
+        # Special writes (errors, interrupts...) replace earlier ones; regular writes are kept once.
+        key = ['thread_id', 'checkpoint_ns', 'checkpoint_id', 'task_id', 'idx']
+        with self.engine.begin() as connection:
+            self.insert(connection, writes_table, rows, key, update=all(channel in WRITES_IDX_MAP for channel, _ in writes))
+
+    def delete_thread(self, thread_id) -> None:
+        """Delete every checkpoint, blob and write of a thread."""
+        with self.engine.begin() as connection:
+            for table in (checkpoints_table, blobs_table, writes_table):
+                connection.execute(delete(table).where(table.c.thread_id == str(thread_id)))
+
+    # The async interface, used by ainvoke/astream, runs the synchronous queries in a worker thread.
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        checkpoints = await asyncio.to_thread(lambda: [*self.list(config, filter=filter, before=before, limit=limit)])
+        for checkpoint in checkpoints:
+            yield checkpoint
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel) -> str:
+        # Zero-padded so versions sort as strings, with a random suffix like InMemorySaver.
+        if current is None:
+            current_version = 0
+        elif isinstance(current, int):
+            current_version = current
+        else:
+            current_version = int(current.split(".")[0])
+        return f"{current_version + 1:032}.{random.random():016}"
+
+    def load_tuple(self, connection, row, metadata=None) -> CheckpointTuple:
+        """Rebuild a CheckpointTuple from a graph_checkpoints row, loading its channel values and writes."""
+        checkpoint = self.serde.loads_typed((row.type, row.checkpoint))
+        if metadata is None:
+            metadata = self.serde.loads_typed((row.metadata_type, row.checkpoint_metadata))
+
+        versions = [(channel, str(version)) for channel, version in checkpoint["channel_versions"].items()]
+        channel_values = {}
+        if versions:
+            blob_rows = connection.execute(select(blobs_table.c.channel, blobs_table.c.type, blobs_table.c.blob).where(
+                blobs_table.c.thread_id == row.thread_id,
+                blobs_table.c.checkpoint_ns == row.checkpoint_ns,
+                tuple_(blobs_table.c.channel, blobs_table.c.version).in_(versions)
+            )).all()
+            channel_values = {
+                blob.channel: self.serde.loads_typed((blob.type, blob.blob))
+                for blob in blob_rows if blob.type != "empty"
+            }
+
+        write_rows = connection.execute(select(writes_table).where(
+            writes_table.c.thread_id == row.thread_id,
+            writes_table.c.checkpoint_ns == row.checkpoint_ns,
+            writes_table.c.checkpoint_id.in_([row.checkpoint_id] + ([row.parent_checkpoint_id] if row.parent_checkpoint_id else []))
+        ).order_by(writes_table.c.task_path, writes_table.c.task_id, writes_table.c.idx)).all()
+
+        pending_writes = [
+            (write.task_id, write.channel, self.serde.loads_typed((write.type, write.blob)))
+            for write in write_rows if write.checkpoint_id == row.checkpoint_id
+        ]
+        # Sends issued by the parent checkpoint's tasks are replayed into this checkpoint.
+        pending_sends = [
+            self.serde.loads_typed((write.type, write.blob))
+            for write in write_rows if write.checkpoint_id == row.parent_checkpoint_id and write.channel == TASKS
+        ]
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": row.thread_id,
+                    "checkpoint_ns": row.checkpoint_ns,
+                    "checkpoint_id": row.checkpoint_id,
+                }
+            },
+            checkpoint={**checkpoint, "channel_values": channel_values, "pending_sends": pending_sends},
+            metadata=metadata,
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": row.thread_id,
+                        "checkpoint_ns": row.checkpoint_ns,
+                        "checkpoint_id": row.parent_checkpoint_id,
+                    }
+                }
+                if row.parent_checkpoint_id
+                else None
+            ),
+            pending_writes=pending_writes,
+        )
+
+    def prune(self, connection, thread_id, checkpoint_ns):
+        """Delete the checkpoints of a thread older than the last keep, with their writes and unused blobs."""
+        kept = connection.execute(
+            select(checkpoints_table.c.checkpoint_id, checkpoints_table.c.type, checkpoints_table.c.checkpoint)
+            .where(checkpoints_table.c.thread_id == thread_id, checkpoints_table.c.checkpoint_ns == checkpoint_ns)
+            .order_by(checkpoints_table.c.checkpoint_id.desc())
+            .limit(self.keep)
+        ).all()
+        if len(kept) < self.keep:
+            return
+
+        # Checkpoint ids increase over time, so the older checkpoints sort before the oldest kept one.
+        oldest_id = kept[-1].checkpoint_id
+        for table in (checkpoints_table, writes_table):
+            deleted = connection.execute(delete(table).where(
+                table.c.thread_id == thread_id,
+                table.c.checkpoint_ns == checkpoint_ns,
+                table.c.checkpoint_id < oldest_id
+            ))
+            if table is checkpoints_table and deleted.rowcount == 0:
+                return
+
+        versions = {
+            (channel, str(version))
+            for row in kept
+            for channel, version in self.serde.loads_typed((row.type, row.checkpoint))["channel_versions"].items()
+        }
+        connection.execute(delete(blobs_table).where(
+            blobs_table.c.thread_id == thread_id,
+            blobs_table.c.checkpoint_ns == checkpoint_ns,
+            ~tuple_(blobs_table.c.channel, blobs_table.c.version).in_(versions)
+        ))
+
+    def insert(self, connection, table, rows, key, update=False):
+        """Insert rows, skipping (or, with update, overwriting) rows whose key already exists."""
+        dialect_insert = DIALECT_INSERTS.get(connection.dialect.name)
+
+        if dialect_insert is not None:
+            statement = dialect_insert(table)
+            if update:
+                statement = statement.on_conflict_do_update(
+                    index_elements=key,
+                    set_={column: statement.excluded[column] for column in rows[0] if column not in key}
+                )
+            else:
+                statement = statement.on_conflict_do_nothing(index_elements=key)
+            connection.execute(statement, rows)
+            return
+
+        for row in rows:
+            match = [table.c[column] == row[column] for column in key]
+            if update:
+                connection.execute(delete(table).where(*match))
+            elif connection.execute(select(table.c[key[0]]).where(*match)).first() is not None:
+                continue
+            connection.execute(table.insert(), [row])
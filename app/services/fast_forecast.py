@@ -0,0 +1,175 @@
+import logging
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from app.constants import FAST_AR_LAGS, FAST_AR_WINDOW
+from app.extensions.metrics import time_stage
+
+DEFAULT_EXOG_COLUMNS = ['Open', 'Volume', 'MA20', 'Signal', 'RSI', 'Daily_Return', 'Volatility']
+
+# Small ridge penalty keeping the batched normal equations solvable for flat or collinear series.
+RIDGE_PENALTY = 1e-8
+
+# Two-sided 95% normal quantile, matching the alpha=0.05 intervals of the ARIMAX engine.
+Z_95 = 1.959963984540054
+
+
+def shift_rows(matrix, periods):
+    """Shift a (date, ...) array down by periods rows, filling the top with NaN."""
+    shifted = np.full_like(matrix, np.nan)
+    shifted[periods:] = matrix[:-periods]
+    return shifted
+
+def solve_batched_least_squares(design, target):
+    """
+    Solve a least squares problem per ticker, through the batched normal equations
+    (Z'Z + ridge) beta = Z'y. Dates where the design or target has a NaN are left out.
+
+    Parameters:
+    - design: (date, ticker, k) regressors.
+    - target: (date, ticker) values to fit.
+
+    Returns:
+    - (beta, residuals, n_obs): the (ticker, k) coefficients, the (date, ticker) residuals (NaN
+      for the dates left out) and the number of dates fitted per ticker.
+    """
+    valid = np.isfinite(target) & np.isfinite(design).all(axis=-1)
+    weights = valid.astype(float)
+    design = np.where(valid[..., None], design, 0.0)
+    target = np.where(valid, target, 0.0)
+
+    gram = np.einsum('tnk,tnl->nkl', design * weights[..., None], design)
+    gram += RIDGE_PENALTY * np.eye(design.shape[-1])
+    moment = np.einsum('tnk,tn->nk', design * weights[..., None], target)
+    beta = np.linalg.solve(gram, moment[..., None])[..., 0]
+
+    residuals = np.where(valid, target - np.einsum('tnk,nk->tn', design, beta), np.nan)
+    return beta, residuals, weights.sum(axis=0)
+
+@time_stage('build_batched_arx_models')
+def build_batched_arx_models(df, ticker_list, forecast_days=7, exog_cols=None, lags=None, window=None):
+    """
+    Fast screening alternative to build_arimax_model: fit an ARX(lags) model on the differenced
+    Close of every ticker at once with batched least squares, and forecast from it.
+
+    Like an ARIMAX(lags, 1, 0) model (without a constant, as ARIMA has none when d=1), each
+    ticker's model is a regression with AR errors, on the differenced Close and exogenous variables:
+        dClose[t] = gamma . dExog[t] + u[t]
+        u[t] = phi_1 * u[t-1] + ... + phi_p * u[t-p] + e[t]
+    with the order fixed to (lags, 1, 0), so no order search is needed. It is fitted in two
+    least squares steps, the regression and then the AR model of its errors. All tickers are
+    laid out as date x ticker arrays and solved together through their stacked normal equations.
+
+    Exog is held at its last values over the forecast, as in forecast_arimax_result, so its
+    differences are zero and only the AR errors drive the forecast. Some exog (Open,
+    Daily_Return) moves with the same day's close: in levels, or with the AR terms on dClose
+    itself, it would carry the last day's move into every forecast step.
+
+    Parameters:
+    - df: Preprocessed DataFrame for all tickers, with Date as the index and a 'Ticker' column.
+    - ticker_list: Tickers to forecast. The result keeps this order.
+    - forecast_days: Number of days to forecast (default is 7).
+    - exog_cols: List of column names to be used as exogenous regressors (same default as
+                 build_arimax_model).
+    - lags: Number of autoregressive lags. Defaults to FAST_AR_LAGS.
+    - window: Number of most recent dates used for fitting. Defaults to FAST_AR_WINDOW.
+
+    Returns:
+    - A dictionary keyed by ticker, in ticker_list order, with results shaped like
+      build_arimax_model's, or None for tickers without enough data. Confidence intervals are
+      approximate: they assume Gaussian errors and ignore parameter uncertainty.
+    """
+    exog_cols = DEFAULT_EXOG_COLUMNS if exog_cols is None else list(exog_cols)
+    lags = FAST_AR_LAGS if lags is None else lags
+    window = FAST_AR_WINDOW if window is None else window
+
+    logging.info(f"Fitting batched ARX({lags}) models for {len(ticker_list)} tickers...")
+
+    data = df[df['Ticker'].isin(list(ticker_list))]
+    if data.empty:
+        return {ticker: None for ticker in ticker_list}
+
+    # Date x ticker layout: close is (T, N) and exog is (T, N, k).
+    wide = data.reset_index().pivot(index=data.index.name or 'index', columns='Ticker', values=['Close'] + exog_cols).sort_index()
+    wide = wide.iloc[-(window + lags + 1):]
+    tickers = wide['Close'].columns
+    close = wide['Close'].to_numpy(dtype=float)
+    exog = np.stack([wide[column].to_numpy(dtype=float) for column in exog_cols], axis=-1)
+    dates = wide.index
+
+    diff = np.full_like(close, np.nan)
+    diff[1:] = close[1:] - close[:-1]
+    exog_diff = exog - shift_rows(exog, 1)
+
+    # Regression on the exog differences, then an AR(lags) model of its errors.
+    _, errors, _ = solve_batched_least_squares(exog_diff, diff)
+
+    error_lags = np.stack([shift_rows(errors, lag) for lag in range(1, lags + 1)], axis=-1)
+    phi, innovations, n_obs = solve_batched_least_squares(error_lags, errors)
+
+    n_params = len(exog_cols) + lags
+    rss = np.nansum(innovations ** 2, axis=0)
+    dof = np.maximum(n_obs - n_params, 1)
+    sigma2 = rss / dof
+    mle_sigma2 = np.maximum(rss / np.maximum(n_obs, 1), np.finfo(float).tiny)
+    aic = n_obs * (np.log(2 * np.pi * mle_sigma2) + 1) + 2 * (n_params + 1)
+
+    # Each ticker forecasts from its own last observed row, holding exog at its last values,
+    # so the exog differences, and their contribution, are zero over the forecast.
+    observed = np.isfinite(close) & np.isfinite(exog).all(axis=-1)
+    last_row = len(dates) - 1 - np.argmax(observed[::-1], axis=0)
+    columns = np.arange(len(tickers))
+    current_price = close[last_row, columns]
+
+    history = np.stack([errors[np.maximum(last_row - lag, 0), columns] for lag in range(lags)], axis=-1)
+    history = np.nan_to_num(history)
+    forecast_diffs = np.empty((len(tickers), forecast_days))
+    for step in range(forecast_days):
+        next_error = np.einsum('nk,nk->n', phi, history)
+        forecast_diffs[:, step] = next_error
+        history = np.concatenate([next_error[:, None], history[:, :-1]], axis=1)
+    forecast = current_price[:, None] + np.cumsum(forecast_diffs, axis=1)
+
+    # Psi weights of the AR part, accumulated to the price level, give the h-step variance.
+    psi = np.zeros((len(tickers), forecast_days))
+    psi[:, 0] = 1.0
+    for step in range(1, forecast_days):
+        for lag in range(1, min(step, lags) + 1):
+            psi[:, step] += phi[:, lag - 1] * psi[:, step - lag]
+    level_psi = np.cumsum(psi, axis=1)
+    std_error = np.sqrt(sigma2[:, None] * np.cumsum(level_psi ** 2, axis=1))
+    lower_bounds = forecast - Z_95 * std_error
+    upper_bounds = forecast + Z_95 * std_error
+
+    enough_data = n_obs >= n_params + 10
+    results = {}
+    for index, ticker in enumerate(tickers):
+        if not enough_data[index] or not np.isfinite(forecast[index]).all():
+            logging.warning(f"Not enough data for a batched ARX model for {ticker}. Skipping.")
+            continue
+
+        last_date = pd.to_datetime(dates[last_row[index]])
+        ticker_forecast = forecast[index]
+        price = current_price[index]
+        expected_return = ((ticker_forecast[-1] - price) / price) * 100
+        trend = "UPWARD" if ticker_forecast[-1] > price else "DOWNWARD" if ticker_forecast[-1] < price else "NEUTRAL"
+
+        results[ticker] = {
+            'forecast': ticker_forecast,
+            'forecast_dates': [(last_date + timedelta(days=i+1)).strftime('%Y-%m-%d') for i in range(forecast_days)],
+            'confidence_intervals': {
+                'lower': lower_bounds[index],
+                'upper': upper_bounds[index]
+            },
+            'trend': trend,
+            'expected_return': expected_return,
+            'current_price': price,
+            'model_info': {
+                'arimax_order': (lags, 1, 0),
+                'aic': aic[index],
+                'engine': 'batched_arx'
+            }
+        }
+
+    logging.info(f"Batched ARX forecasts complete for {len(results)} of {len(ticker_list)} tickers.")
+    return {ticker: results.get(ticker) for ticker in ticker_list}
@@ -0,0 +1,95 @@
+import os
+import time
+import threading
+from flask import abort
+from .model_store import get_model_path, load_fitted_model
+from .stock_forecast import forecast_arimax_result
+from app.constants import FORECAST_CACHE_TTL
+from app.repository.forecast_run import get_current_snapshot_id
+from app.repository.stock_forecast import get_current_forecast
+
+# Stored models are unpickled once per worker and reloaded only when the forecast job
+# writes a newer file for the ticker.
+_loaded_models = {}
+_lock = threading.Lock()
+
+def get_stored_model(ticker):
+    try:
+        modified_at = os.path.getmtime(get_model_path(ticker))
+    except OSError:
+        return None
+
+    with _lock:
+        loaded = _loaded_models.get(ticker)
+        if loaded and loaded[0] == modified_at:
+            return loaded[1]
+
+    entry = load_fitted_model(ticker)
+    if entry is not None:
+        with _lock:
+            _loaded_models[ticker] = (modified_at, entry)
+    return entry
+
+def get_ticker_forecast(ticker: str, days: int):
+    entry = get_stored_model(ticker.upper())
+
+    if entry is None:
+        abort(404, "Forecast model not found")
+
+    prediction = forecast_arimax_result(entry['result'], entry['last_exog'], entry['last_date'], entry['current_price'], days)
+    lower = prediction['confidence_intervals']['lower']
+    upper = prediction['confidence_intervals']['upper']
+
+    return {
+        "ticker": ticker.upper(),
+        "as_of": entry['last_date'].strftime('%Y-%m-%d'),
+        "current_price": round(float(prediction['current_price']), 2),
+        "trend": prediction['trend'],
+        "expected_return": round(float(prediction['expected_return']), 2),
+        "forecast": [
+            {"date": date, "price": round(float(price), 2), "lower": round(float(low), 2), "upper": round(float(high), 2)}
+            for date, price, low, high in zip(prediction['forecast_dates'], prediction['forecast'], lower, upper)
+        ],
+        "model_info": {
+            "order": list(entry['order']),
+            "fitted_at": entry['fitted_at'].isoformat()
+        }
+    }
+
+# Decoded StockForecast payloads of the published snapshot, per worker. The snapshot id is
+# checked at most every FORECAST_CACHE_TTL seconds, and the cache is dropped when the forecast
+# job publishes a new one.
+_snapshot_cache = {'version': None, 'checked_at': 0.0, 'payloads': {}}
+_snapshot_lock = threading.Lock()
+
+def get_snapshot_version():
+    now = time.monotonic()
+    with _snapshot_lock:
+        if now - _snapshot_cache['checked_at'] < FORECAST_CACHE_TTL:
+            return _snapshot_cache['version']
+
+    version = get_current_snapshot_id()
+    with _snapshot_lock:
+        if version != _snapshot_cache['version']:
+            _snapshot_cache['version'] = version
+            _snapshot_cache['payloads'] = {}
+        _snapshot_cache['checked_at'] = now
+    return version
+
+def get_forecast_payload(ticker: str):
+    """
+    Returns the serialized StockForecast of a ticker from the published snapshot, decoding it
+    only on the first lookup per snapshot. The result is shared between requests: do not modify it.
+    """
+    version = get_snapshot_version()
+
+    with _snapshot_lock:
+        payload = _snapshot_cache['payloads'].get(ticker)
+    if payload is not None:
+        return payload
+
+    payload = get_current_forecast(ticker).serialize()
+    with _snapshot_lock:
+        if _snapshot_cache['version'] == version:
+            _snapshot_cache['payloads'][ticker] = payload
+    return payload
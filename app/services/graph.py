@@ -1,72 +1,97 @@
-from typing import Annotated, Any
-from typing_extensions import TypedDict
+from typing import Annotated, Any, Optional
+from typing_extensions import TypedDict, NotRequired
 
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
+from langgraph.utils.runnable import RunnableCallable
 from langgraph.graph.message import add_messages
-from langchain_groq import ChatGroq
-from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.messages import ToolMessage
 from .prompt_templates import *
-from app.models import StockForecast
-from app.repository import base
+from .forecast import get_forecast_payload
+from .checkpointer import SQLAlchemyCheckpointSaver
+from .llm import get_llm, get_llm_with_tools
+from app.extensions import database
+from .market_analysis import analyse_market, aanalyse_market
+from .chat_context import get_chatbot_messages, get_follow_up_context, needs_summary, summarize_conversation, asummarize_conversation
 from langgraph.types import Command
 from langchain_core.tools.base import InjectedToolCallId
 from langgraph.prebuilt.chat_agent_executor import AgentState
 from langchain_core.runnables import RunnableConfig
+from langchain_core.callbacks import BaseCallbackHandler
+from app.extensions.metrics import record, GRAPH_NODE_SECONDS, GRAPH_NODE_FAILURES
+import threading
+import time
 
-memory = MemorySaver()
 
-def get_llm():
-    return ChatGroq(
-        model="llama-3.3-70b-versatile",
-        temperature=0,
-        max_tokens=None,
-        timeout=None,
-        max_retries=2
-    )
+class NodeMetricsHandler(BaseCallbackHandler):
+    """Records the latency of every graph node run. Nested runs inside a node (prompts, LLM calls) are ignored."""
+
+    def __init__(self):
+        self.started = {}
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get('langgraph_node')
+        if node and kwargs.get('name') == node and not node.startswith('__'):
+            self.started[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self.finish(run_id, failed=False)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self.finish(run_id, failed=True)
+
+    def finish(self, run_id, failed):
+        node, started = self.started.pop(run_id, (None, None))
+        if node is not None:
+            record(GRAPH_NODE_SECONDS, GRAPH_NODE_FAILURES, time.perf_counter() - started, failed, node=node)
 
 class State(AgentState):
     messages: Annotated[list, add_messages]
-    stock_prices: list[dict, Any]
-    predicted_prices: list[dict, Any]
+    stock_prices: dict[str, Any]
+    predicted_prices: dict[str, Any]
     end_chat: bool
     follow_up: str
     stock: str
+    forecast_snapshot: NotRequired[Optional[int]]
+    summary: NotRequired[str]
 
 def stock_forecaster(state: State, tool_call_id: Annotated[str, InjectedToolCallId]):
     """fetches stock prices and forecast"""
 
-    stock_info = base.get_record_by_field(StockForecast, 'ticker', state['stock']).serialize()
+    stock_info = get_forecast_payload(state['stock'])
 
     # artifact = {'stock_prices': stock_info['retrieved_data'], 'predicted_prices': stock_info['forecast']}
 
+    # The ticker and snapshot key the stored market analysis (see services/market_analysis.py)
     return Command(update={
+        'stock': stock_info['ticker'],
+        'forecast_snapshot': stock_info['run_id'],
         'stock_prices': stock_info['retrieved_data'],
         'predicted_prices': stock_info['forecast'],
         "messages": [ToolMessage( "Successfully looked up stock forecast", tool_call_id=tool_call_id)]
     })
 
 def market_analyser(state: State):
-    analyst = get_market_analysis_template() | get_llm()
-
-    response = analyst.invoke({
-        'stock_prices': state['stock_prices'], 
-        'predicted_prices': state['predicted_prices']
-    })
+    response = analyse_market(state.get('stock'), state.get('forecast_snapshot'), state['stock_prices'], state['predicted_prices'])
+    return {'messages': [response], 'analysis': response.content}
 
+async def amarket_analyser(state: State):
+    response = await aanalyse_market(state.get('stock'), state.get('forecast_snapshot'), state['stock_prices'], state['predicted_prices'])
     return {'messages': [response], 'analysis': response.content}
 
 def follow_up_chatbot(state: State):
-    follow_up = get_follow_up_template() | get_llm()
-
-    response = follow_up.invoke({
-        'chat_history': state['messages'], 
-        'query': state['follow_up']
-    })
+    response = (get_follow_up_template() | get_llm()).invoke(get_follow_up_input(state))
+    return {'messages': [response], 'end_chat': True}
 
+async def afollow_up_chatbot(state: State):
+    response = await (get_follow_up_template() | get_llm()).ainvoke(get_follow_up_input(state))
     return {'messages': [response], 'end_chat': True}
 
+def get_follow_up_input(state: State):
+    return {
+        **get_follow_up_context(state),
+        'query': state['follow_up']
+    }
 
 def route_logic(state: State):
     """Route logic to determine the next node."""
@@ -77,21 +102,30 @@ def route_logic(state: State):
     else:
         return 'tools'
 
+def route_follow_up(state: State):
+    """Folds the older turns into the summary once enough of them have piled up (see services/chat_context.py)."""
+    return 'summarize_conversation' if needs_summary(state) else 'chatbot'
+
 tools = [stock_forecaster]
-llm_with_tools = get_llm().bind_tools(tools=tools)
 
 def chatbot(state: State):
-    response = llm_with_tools.invoke(state['messages'])
+    response = get_llm_with_tools(tools).invoke(get_chatbot_messages(state))
+    return {'messages': [response]}
+
+async def achatbot(state: State):
+    response = await get_llm_with_tools(tools).ainvoke(get_chatbot_messages(state))
     return {'messages': [response]}
 
 
-def get_graph():
+def build_graph(checkpointer=None):
     graph_builder = StateGraph(State)
 
-    graph_builder.add_node('chatbot', chatbot)
+    # The LLM nodes have a native async variant, used when the graph runs through ainvoke/astream
+    graph_builder.add_node('chatbot', RunnableCallable(chatbot, achatbot))
     graph_builder.add_node('stock_forecaster', stock_forecaster)
-    graph_builder.add_node('market_analyser', market_analyser)
-    graph_builder.add_node('follow_up_chatbot', follow_up_chatbot)
+    graph_builder.add_node('market_analyser', RunnableCallable(market_analyser, amarket_analyser))
+    graph_builder.add_node('follow_up_chatbot', RunnableCallable(follow_up_chatbot, afollow_up_chatbot))
+    graph_builder.add_node('summarize_conversation', RunnableCallable(summarize_conversation, asummarize_conversation))
 
     tool_node = ToolNode(tools=tools)
 
@@ -99,10 +133,28 @@ def get_graph():
     graph_builder.add_conditional_edges("chatbot", route_logic, {"tools": "tools", "follow_up_chatbot": "follow_up_chatbot", END: END})
 
     graph_builder.add_edge('tools', 'market_analyser')
-    graph_builder.add_edge('follow_up_chatbot', 'chatbot')
+    graph_builder.add_conditional_edges('follow_up_chatbot', route_follow_up, {'summarize_conversation': 'summarize_conversation', 'chatbot': 'chatbot'})
+    graph_builder.add_edge('summarize_conversation', 'chatbot')
     graph_builder.add_edge('market_analyser', END)
     graph_builder.set_entry_point('chatbot')
 
-    graph = graph_builder.compile()
+    graph = graph_builder.compile(checkpointer=checkpointer).with_config(callbacks=[NodeMetricsHandler()])
+
+    return graph
 
+# Graphs are compiled once per worker, on first use: a persistent one that saves conversation state
+# through the database checkpointer, keyed by the thread_id of chat.get_graph_configuration, and one
+# without a checkpointer for anonymous chats.
+_compiled_graphs = {}
+_graphs_lock = threading.Lock()
+
+def get_graph(persistent=True):
+    """Returns this worker's compiled graph. The persistent graph is first built within the app context."""
+    graph = _compiled_graphs.get(persistent)
+    if graph is None:
+        with _graphs_lock:
+            graph = _compiled_graphs.get(persistent)
+            if graph is None:
+                checkpointer = SQLAlchemyCheckpointSaver(database.engine) if persistent else None
+                graph = _compiled_graphs[persistent] = build_graph(checkpointer)
     return graph
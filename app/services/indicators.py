@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+INDICATOR_COLUMNS = ['MA5', 'MA20', 'EMA12', 'EMA26', 'MACD', 'Signal', 'RSI', 'Daily_Return', 'Volatility']
+
+# Variables later used as regressors in the ARIMAX model, standardized per ticker.
+EXOG_STANDARD_COLUMNS = ['Open', 'Volume', 'MA20', 'Signal', 'RSI', 'Daily_Return', 'Volatility']
+
+
+def compute_indicator_matrices(close):
+    """
+    Calculate technical indicators for every ticker at once.
+
+    Parameters:
+    - close: Date x ticker DataFrame of closing prices, sorted by date.
+
+    Returns:
+    - A dict mapping each name in INDICATOR_COLUMNS to a date x ticker DataFrame.
+    """
+    indicators = {}
+
+    # Moving averages (MA5, MA20) with minimum periods equal to the window size.
+    indicators['MA5'] = close.rolling(window=5, min_periods=5).mean()
+    indicators['MA20'] = close.rolling(window=20, min_periods=20).mean()
+
+    # MACD: EMA12, EMA26, MACD, and Signal line.
+    indicators['EMA12'] = close.ewm(span=12, adjust=False).mean()
+    indicators['EMA26'] = close.ewm(span=26, adjust=False).mean()
+    indicators['MACD'] = indicators['EMA12'] - indicators['EMA26']
+    indicators['Signal'] = indicators['MACD'].ewm(span=9, adjust=False).mean()
+
+    # RSI over a 14-day window. A ticker's first bar counts as a zero move, and bars
+    # before it stay empty, so each column behaves as if it were computed on its own.
+    delta = close.diff()
+    listed = close.notna()
+    gain = delta.where(delta > 0, 0).where(listed)
+    loss = (-delta).where(delta < 0, 0).where(listed)
+    avg_gain = gain.rolling(window=14, min_periods=14).mean()
+    avg_loss = loss.rolling(window=14, min_periods=14).mean()
+    rs = avg_gain / avg_loss
+    indicators['RSI'] = 100 - (100 / (1 + rs))
+
+    # Daily Returns (percentage change) and their 21-day rolling standard deviation.
+    indicators['Daily_Return'] = close.pct_change(fill_method=None) * 100
+    indicators['Volatility'] = indicators['Daily_Return'].rolling(window=21, min_periods=21).std()
+
+    return indicators
+
+def standardize_columns(values, present):
+    """
+    Standardize every ticker column of a date x ticker array to zero mean and unit variance,
+    using only the cells where the ticker has a bar. Matches StandardScaler: NaNs are ignored
+    when fitting and kept in the output, and constant columns are left unscaled.
+    """
+    masked = np.where(present, values, np.nan)
+    mean = np.nanmean(masked, axis=0)
+    std = np.nanstd(masked, axis=0)
+    std[~(std > 10 * np.finfo(std.dtype).eps)] = 1.0
+    return (values - mean) / std
+
+def compute_indicators(df):
+    """
+    Calculate technical indicators and standardized exogenous variables for all tickers
+    in a long OHLCV frame.
+
+    The frame is pivoted once into date x ticker matrices, indicators are computed as
+    column-wise operations over every ticker together, and the results are gathered back
+    into the original long layout.
+
+    Parameters:
+    - df: DataFrame with Date as index and columns: Ticker, Open, High, Low, Close, Volume.
+
+    Returns:
+    - DataFrame with Date as index and columns Ticker, the OHLCV columns and INDICATOR_COLUMNS,
+      ordered by ticker and then date. Columns in EXOG_STANDARD_COLUMNS are standardized per ticker.
+
+    Note:
+    - Missing prices are forward-filled from the same ticker's previous bar.
+    """
+    long_df = df[['Ticker'] + PRICE_COLUMNS]
+    dates = pd.DatetimeIndex(long_df.index)
+    tickers = long_df['Ticker'].to_numpy()
+
+    date_index = dates.unique().sort_values()
+    ticker_index = pd.Index(pd.unique(tickers)).sort_values()
+    row_positions = date_index.get_indexer(dates)
+    column_positions = ticker_index.get_indexer(tickers)
+
+    if pd.Series(row_positions * len(ticker_index) + column_positions).duplicated().any():
+        raise ValueError("Each ticker can only have one row per date.")
+
+    shape = (len(date_index), len(ticker_index))
+    present = np.zeros(shape, dtype=bool)
+    present[row_positions, column_positions] = True
+
+    matrices = {}
+    for column in PRICE_COLUMNS:
+        matrix = np.full(shape, np.nan)
+        matrix[row_positions, column_positions] = long_df[column].to_numpy(dtype=float)
+        matrices[column] = pd.DataFrame(matrix, index=date_index, columns=ticker_index).ffill()
+
+    matrices.update(compute_indicator_matrices(matrices['Close']))
+
+    # Rows come out grouped by ticker and sorted by date within each ticker.
+    order = np.lexsort((row_positions, column_positions))
+    row_positions = row_positions[order]
+    column_positions = column_positions[order]
+
+    result = {'Ticker': ticker_index.to_numpy()[column_positions]}
+    for column in PRICE_COLUMNS + INDICATOR_COLUMNS:
+        values = matrices[column].to_numpy()
+        if column in EXOG_STANDARD_COLUMNS:
+            values = standardize_columns(values, present)
+        result[column] = values[row_positions, column_positions]
+
+    return pd.DataFrame(result, index=pd.DatetimeIndex(date_index[row_positions], name=df.index.name))
@@ -0,0 +1,59 @@
+import threading
+import httpx
+from langchain_groq import ChatGroq
+from ..constants import *
+
+# LLM clients are built once per worker, on first use, and shared by every request and graph node.
+# They all send through the same pair of HTTP clients, so connections to the model endpoint are kept
+# alive between calls. At most LLM_MAX_CONNECTIONS sync calls, and LLM_ASYNC_MAX_CONNECTIONS async
+# calls (made by the chats asgi.py serves), are in flight per worker: further calls wait up to
+# LLM_POOL_TIMEOUT seconds for a free connection. asgi.py admits no more chats than the async pool
+# has connections, so admitted chats do not wait for one.
+_clients = {}
+_lock = threading.RLock()
+
+def get_connection_limits(max_connections=LLM_MAX_CONNECTIONS):
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY
+    )
+
+def get_timeout():
+    return httpx.Timeout(LLM_TIMEOUT, pool=LLM_POOL_TIMEOUT)
+
+def get_client(key, build):
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = build()
+    return client
+
+def get_http_client() -> httpx.Client:
+    return get_client('http', lambda: httpx.Client(limits=get_connection_limits(), timeout=get_timeout()))
+
+def get_async_http_client() -> httpx.AsyncClient:
+    return get_client('http_async', lambda: httpx.AsyncClient(limits=get_connection_limits(LLM_ASYNC_MAX_CONNECTIONS), timeout=get_timeout()))
+
+def get_llm() -> ChatGroq:
+    """Returns this worker's chat model client."""
+    return get_client('llm', lambda: ChatGroq(
+        model=LLM_MODEL,
+        temperature=0,
+        max_tokens=None,
+        timeout=LLM_TIMEOUT,
+        max_retries=LLM_MAX_RETRIES,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client()
+    ))
+
+def get_llm_with_tools(tools):
+    """
+    Returns the chat model bound to the given tools, sharing the client of get_llm.
+
+    Parameters:
+        tools (list): The tools, which must be the same list object on every call.
+    """
+    return get_client(('llm_with_tools', id(tools)), lambda: get_llm().bind_tools(tools=tools))
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from langchain_core.messages import AIMessage
+from ..constants import MARKET_ANALYSIS_WORKERS
+from ..repository.market_analysis import get_market_analysis, get_analysed_tickers, save_market_analysis
+from ..repository.stock_forecast import get_snapshot_forecasts
+from ..extensions.metrics import MARKET_ANALYSIS_LOOKUPS
+from .prompt_templates import get_market_analysis_template, MARKET_ANALYSIS_PROMPT_VERSION
+from .prompt_context import build_price_context
+from .llm import get_llm
+
+# Every user asking about a ticker gets the same prices and forecast until the next snapshot is
+# published, so analyses are stored per (snapshot, ticker, prompt version) and generated once.
+# Analyses of forecasts not yet in a snapshot (before the first publish) are never stored.
+
+def get_market_analysis_input(stock_prices, predicted_prices):
+    return {'price_context': build_price_context(stock_prices, predicted_prices)}
+
+def generate_market_analysis(stock_prices, predicted_prices) -> AIMessage:
+    return (get_market_analysis_template() | get_llm()).invoke(get_market_analysis_input(stock_prices, predicted_prices))
+
+async def agenerate_market_analysis(stock_prices, predicted_prices) -> AIMessage:
+    return await (get_market_analysis_template() | get_llm()).ainvoke(get_market_analysis_input(stock_prices, predicted_prices))
+
+def analyse_market(ticker, snapshot_id, stock_prices, predicted_prices) -> AIMessage:
+    """
+    Returns the market analysis of a ticker's prices and forecast, from the cache when the snapshot
+    already has one, otherwise generated by the LLM and stored.
+
+    Parameters:
+        ticker (str): The ticker.
+        snapshot_id (int | None): The run_id of the forecast the prices come from.
+        stock_prices (dict): The stored price series.
+        predicted_prices (dict): The stored forecast series.
+
+    Returns:
+        AIMessage: The analysis.
+    """
+    if ticker and snapshot_id is not None:
+        analysis = get_market_analysis(snapshot_id, ticker, MARKET_ANALYSIS_PROMPT_VERSION)
+        if analysis is not None:
+            MARKET_ANALYSIS_LOOKUPS.labels('hit').inc()
+            return AIMessage(content=analysis)
+
+    response = generate_market_analysis(stock_prices, predicted_prices)
+
+    if ticker and snapshot_id is not None:
+        MARKET_ANALYSIS_LOOKUPS.labels('miss').inc()
+        save_market_analysis(snapshot_id, ticker, MARKET_ANALYSIS_PROMPT_VERSION, response.content)
+    return response
+
+async def aanalyse_market(ticker, snapshot_id, stock_prices, predicted_prices) -> AIMessage:
+    """Async variant of analyse_market. Database calls run in a worker thread."""
+    if ticker and snapshot_id is not None:
+        analysis = await asyncio.to_thread(get_market_analysis, snapshot_id, ticker, MARKET_ANALYSIS_PROMPT_VERSION)
+        if analysis is not None:
+            MARKET_ANALYSIS_LOOKUPS.labels('hit').inc()
+            return AIMessage(content=analysis)
+
+    response = await agenerate_market_analysis(stock_prices, predicted_prices)
+
+    if ticker and snapshot_id is not None:
+        MARKET_ANALYSIS_LOOKUPS.labels('miss').inc()
+        await asyncio.to_thread(save_market_analysis, snapshot_id, ticker, MARKET_ANALYSIS_PROMPT_VERSION, response.content)
+    return response
+
+def precompute_market_analyses(run_id, workers=MARKET_ANALYSIS_WORKERS):
+    """
+    Generates and stores the analysis of every ticker of a snapshot that does not have one yet.
+    At most workers LLM calls run at once; results are stored from the calling thread, which must
+    be within an app context.
+
+    Returns:
+        tuple: (number of analyses stored, number of tickers that failed)
+    """
+    analysed = get_analysed_tickers(run_id, MARKET_ANALYSIS_PROMPT_VERSION)
+    forecasts = [forecast for forecast in get_snapshot_forecasts(run_id) if forecast.ticker not in analysed]
+    if not forecasts:
+        return 0, 0
+
+    stored, failed = 0, 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(generate_market_analysis, forecast.retrieved_data, forecast.forecast): forecast.ticker
+            for forecast in forecasts
+        }
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                response = future.result()
+            except Exception as e:
+                logging.warning(f"Market analysis of {ticker} for run {run_id} failed: {e}")
+                failed += 1
+                continue
+
+            stored += save_market_analysis(run_id, ticker, MARKET_ANALYSIS_PROMPT_VERSION, response.content)
+
+    return stored, failed
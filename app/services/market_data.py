@@ -0,0 +1,174 @@
+import os
+import re
+import time
+import logging
+import pandas as pd
+from abc import ABC, abstractmethod
+import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor
+from app.constants import (
+    MARKET_DATA_PROVIDER, MARKET_DATA_BATCH_SIZE, MARKET_DATA_MAX_WORKERS,
+    MARKET_DATA_RETRIES, MARKET_DATA_FIXTURES_DIR
+)
+from app.services.indicators import PRICE_COLUMNS
+
+TIDY_COLUMNS = ['Ticker'] + PRICE_COLUMNS
+
+
+def tidy_frame(frames):
+    """
+    Merge per-ticker frames into the tidy layout used by the pipeline: Date as index and
+    columns Ticker, Open, High, Low, Close, Volume, sorted by Date and Ticker.
+    """
+    frames = [frame for frame in frames if frame is not None and not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=TIDY_COLUMNS, index=pd.DatetimeIndex([], name='Date'))
+
+    df = pd.concat(frames).rename_axis('Date').reset_index()
+    df['Date'] = pd.to_datetime(df['Date'])
+    df = df.sort_values(['Date', 'Ticker'], kind='stable').set_index('Date')
+    return df[TIDY_COLUMNS]
+
+
+class MarketDataProvider(ABC):
+    """Source of daily OHLCV bars for the forecasting pipeline."""
+
+    @abstractmethod
+    def download(self, ticker_list, start_date, end_date):
+        """
+        Returns a tidy DataFrame (see tidy_frame) with the daily bars of every ticker in
+        ticker_list between start_date and end_date (end exclusive). Tickers without data
+        are left out rather than failing the whole call.
+        """
+
+
+class YahooFinanceProvider(MarketDataProvider):
+    """
+    Downloads bars from Yahoo Finance. Every ticker is downloaded as its own task on a pool of
+    max_workers threads, so that many requests are in flight however the universe is batched.
+    Batches group the tickers whose failures are retried together with exponential backoff,
+    and whose frames are merged together.
+
+    Each ticker is requested through yf.Ticker.history rather than yf.download, because
+    yf.download keeps its results in module-level state and cannot run concurrently.
+    """
+
+    def __init__(self, batch_size=MARKET_DATA_BATCH_SIZE, max_workers=MARKET_DATA_MAX_WORKERS,
+                 retries=MARKET_DATA_RETRIES, backoff=1.0):
+        self.batch_size = max(1, batch_size)
+        self.max_workers = max(1, max_workers)
+        self.retries = retries
+        self.backoff = backoff
+
+    def download(self, ticker_list, start_date, end_date):
+        ticker_list = list(ticker_list)
+        batches = [ticker_list[i:i + self.batch_size] for i in range(0, len(ticker_list), self.batch_size)]
+        logging.info(f"Downloading {len(ticker_list)} tickers from Yahoo Finance in {len(batches)} batches...")
+
+        # Batches only wait on their tickers' tasks, so one batch backing off before a retry
+        # does not hold up the downloads of the others.
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor, \
+                ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches) or 1)) as batch_executor:
+            batch_frames = list(batch_executor.map(
+                lambda batch: self.download_batch(executor, batch, start_date, end_date), batches))
+
+        return tidy_frame([frame for frames in batch_frames for frame in frames])
+
+    def download_ticker(self, ticker, start_date, end_date):
+        """Returns the ticker's bars, or None if it has none. Raises if the request fails."""
+        history = yf.Ticker(ticker).history(
+            start=start_date.strftime('%Y-%m-%d'),
+            end=end_date.strftime('%Y-%m-%d'),
+            raise_errors=True
+        )
+        if history.empty:
+            return None
+
+        history.index = pd.DatetimeIndex(history.index).tz_localize(None)
+        return history[PRICE_COLUMNS].assign(Ticker=ticker)
+
+    def download_batch(self, executor, batch, start_date, end_date):
+        frames = []
+        pending = list(batch)
+
+        for attempt in range(self.retries + 1):
+            futures = {ticker: executor.submit(self.download_ticker, ticker, start_date, end_date) for ticker in pending}
+
+            failed = []
+            for ticker, future in futures.items():
+                try:
+                    frame = future.result()
+                except Exception as e:
+                    logging.warning(f"Error downloading {ticker} (attempt {attempt + 1}): {e}")
+                    failed.append(ticker)
+                    continue
+
+                if frame is not None:
+                    frames.append(frame)
+
+            if not failed:
+                break
+
+            pending = failed
+            if attempt < self.retries:
+                time.sleep(self.backoff * 2 ** attempt)
+        else:
+            logging.error(f"Giving up on {len(pending)} tickers after {self.retries + 1} attempts: {pending}")
+
+        return frames
+
+
+class FileProvider(MarketDataProvider):
+    """
+    Reads bars from fixture files, one per ticker, named <ticker>.parquet or <ticker>.csv,
+    each with a Date column (or index) and the OHLCV columns. Lets the whole pipeline run
+    and be benchmarked without network access.
+    """
+
+    def __init__(self, directory=MARKET_DATA_FIXTURES_DIR):
+        self.directory = directory
+
+    def read_fixture(self, ticker):
+        safe_ticker = re.sub(r'[^A-Za-z0-9.\-]', '_', ticker)
+        parquet_path = os.path.join(self.directory, f"{safe_ticker}.parquet")
+        csv_path = os.path.join(self.directory, f"{safe_ticker}.csv")
+
+        if os.path.exists(parquet_path):
+            df = pd.read_parquet(parquet_path)
+        elif os.path.exists(csv_path):
+            df = pd.read_csv(csv_path)
+        else:
+            logging.warning(f"No fixture found for {ticker} in {self.directory}.")
+            return None
+
+        if 'Date' in df.columns:
+            df = df.set_index('Date')
+        df.index = pd.to_datetime(df.index)
+        return df
+
+    def download(self, ticker_list, start_date, end_date):
+        start_date = pd.Timestamp(start_date).normalize()
+        end_date = pd.Timestamp(end_date).normalize()
+
+        frames = []
+        for ticker in ticker_list:
+            df = self.read_fixture(ticker)
+            if df is None:
+                continue
+            window = df[(df.index >= start_date) & (df.index < end_date)]
+            frames.append(window[PRICE_COLUMNS].assign(Ticker=ticker))
+
+        return tidy_frame(frames)
+
+
+PROVIDERS = {
+    'yahoo': YahooFinanceProvider,
+    'file': FileProvider
+}
+
+def get_provider(name=None):
+    """Returns the market data provider named by MARKET_DATA_PROVIDER ('yahoo' or 'file')."""
+    name = (name or MARKET_DATA_PROVIDER).lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown market data provider '{name}'. Use one of: {', '.join(PROVIDERS)}.")
+    return PROVIDERS[name]()
@@ -0,0 +1,112 @@
+import os
+import re
+import pickle
+import hashlib
+import logging
+import pandas as pd
+from app.constants import MODEL_STORE_DIR, MODEL_CACHE_DIR, MODEL_CACHE_MAX_MB
+
+
+def get_model_path(ticker):
+    safe_ticker = re.sub(r'[^A-Za-z0-9.\-]', '_', ticker)
+    return os.path.join(MODEL_STORE_DIR, f"{safe_ticker}.pkl")
+
+def write_pickle(path, entry):
+    """
+    Pickle entry to path. The file is written to a temporary path first and then swapped in,
+    so readers never see a partially written model.
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temp_path, 'wb') as file:
+            pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+        return True
+    except Exception as e:
+        logging.error(f"Error saving fitted model to {path}: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+
+def read_pickle(path):
+    try:
+        with open(path, 'rb') as file:
+            return pickle.load(file)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.error(f"Error loading fitted model from {path}: {e}")
+        return None
+
+def save_fitted_model(ticker, entry):
+    """Persist a ticker's latest fitted ARIMAX results and the metadata needed to extend them."""
+    write_pickle(get_model_path(ticker), entry)
+
+def load_fitted_model(ticker):
+    return read_pickle(get_model_path(ticker))
+
+# ----------------------------
+# Content-addressed cache of fitted results
+# ----------------------------
+def get_cache_key(ticker, df, exog_cols, order):
+    """
+    Key a fitted model by everything that determines it: the ticker, the exact input window
+    (dates, closes and exogenous values), the exogenous column set and the model order.
+    """
+    columns = ['Close'] + list(exog_cols)
+    digest = hashlib.sha256()
+    digest.update(f"{ticker}|{','.join(exog_cols)}|{tuple(int(x) for x in order)}|".encode())
+    digest.update(pd.util.hash_pandas_object(df[columns], index=True).values.tobytes())
+    return digest.hexdigest()
+
+def get_cache_path(key):
+    return os.path.join(MODEL_CACHE_DIR, f"{key}.pkl")
+
+def load_cached_result(key):
+    """Returns the cached entry for key, or None. A hit marks the entry as recently used."""
+    path = get_cache_path(key)
+    entry = read_pickle(path)
+    if entry is not None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+    return entry
+
+def save_cached_result(key, entry):
+    """Cache entry under key. The cache is not trimmed here: see evict_cached_results."""
+    write_pickle(get_cache_path(key), entry)
+
+def evict_cached_results(max_bytes=None):
+    """
+    Remove the least recently used cache entries until the cache fits in MODEL_CACHE_MAX_MB.
+    This scans the whole cache, so it is run once per batch of fits (see
+    stock_forecast.build_arimax_models) rather than after every save.
+    """
+    max_bytes = MODEL_CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+
+    entries = []
+    try:
+        with os.scandir(MODEL_CACHE_DIR) as scanner:
+            for item in scanner:
+                if not item.name.endswith('.pkl'):
+                    continue
+                try:
+                    stat = item.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, item.path))
+    except FileNotFoundError:
+        return
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
@@ -0,0 +1,69 @@
+import numpy as np
+
+# Price series are stored and served in a columnar form:
+#   {"start": "2025-01-02", "offsets": [0, 1, 2, 5, ...], "prices": [187.15, 185.64, ...]}
+# where offsets are whole days after start. The legacy form is one {"date", "price"} dict per day.
+
+
+def encode_price_series(dates, prices):
+    """
+    Build a columnar series from parallel dates and prices (dates may be strings, datetimes
+    or a DatetimeIndex). Prices are rounded to 2 decimals and rows without a price are dropped.
+    """
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    prices = np.round(np.asarray(prices, dtype=float), 2)
+
+    observed = np.isfinite(prices)
+    dates = dates[observed]
+    prices = prices[observed]
+
+    if len(dates) == 0:
+        return {"start": None, "offsets": [], "prices": []}
+
+    return {
+        "start": str(dates[0]),
+        "offsets": (dates - dates[0]).astype(np.int64).tolist(),
+        "prices": prices.tolist()
+    }
+
+def encode_series_by_ticker(df, column='Close'):
+    """
+    Build a columnar series per ticker from a tidy frame with Date as index and a 'Ticker' column,
+    without masking the frame once per ticker.
+    """
+    tickers = df['Ticker'].to_numpy()
+    dates = df.index.to_numpy().astype('datetime64[D]')
+    prices = df[column].to_numpy(dtype=float)
+
+    # Group rows by ticker, keeping them in date order within each ticker.
+    order = np.lexsort((dates, tickers))
+    tickers, dates, prices = tickers[order], dates[order], prices[order]
+
+    unique_tickers, starts = np.unique(tickers, return_index=True)
+    ends = np.append(starts[1:], len(tickers))
+
+    return {
+        ticker: encode_price_series(dates[start:end], prices[start:end])
+        for ticker, start, end in zip(unique_tickers, starts, ends)
+    }
+
+def expand_price_series(series):
+    """Convert a columnar series to the legacy list of {"date", "price"} rows. Legacy lists pass through."""
+    if series is None or isinstance(series, list):
+        return series
+
+    if not series['offsets']:
+        return []
+
+    dates = np.datetime64(series['start'], 'D') + np.asarray(series['offsets'], dtype=np.int64)
+    return [
+        {"date": date, "price": price}
+        for date, price in zip(dates.astype(str).tolist(), series['prices'])
+    ]
+
+def compact_price_series(series):
+    """Convert legacy {"date", "price"} rows to a columnar series. Columnar series pass through."""
+    if series is None or isinstance(series, dict):
+        return series
+
+    return encode_price_series([row['date'] for row in series], [row['price'] for row in series])
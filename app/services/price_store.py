@@ -0,0 +1,165 @@
+import os
+import re
+import json
+import logging
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from app.constants import PRICE_STORE_DIR
+from app.services.indicators import PRICE_COLUMNS
+from app.services.market_data import tidy_frame
+
+METADATA_KEY = b'quantai'
+
+# Relative difference allowed between a stored close and a re-downloaded one before the
+# ticker's history is treated as re-adjusted (splits, dividends) and fetched again in full.
+ADJUSTMENT_TOLERANCE = 1e-4
+
+
+def get_price_path(ticker):
+    safe_ticker = re.sub(r'[^A-Za-z0-9.\-]', '_', ticker)
+    return os.path.join(PRICE_STORE_DIR, f"{safe_ticker}.parquet")
+
+def load_prices(ticker):
+    """
+    Returns (prices, coverage) for a ticker, where prices is a DataFrame with Date as index
+    and the OHLCV columns, and coverage is {'start', 'end'}: the date range already requested
+    from the provider (end exclusive). Both are None if the ticker has not been stored yet.
+    """
+    path = get_price_path(ticker)
+    if not os.path.exists(path):
+        return None, None
+
+    try:
+        table = pq.read_table(path)
+        coverage = json.loads(table.schema.metadata[METADATA_KEY])
+        prices = table.to_pandas()
+        return prices, {'start': pd.Timestamp(coverage['start']), 'end': pd.Timestamp(coverage['end'])}
+    except Exception as e:
+        logging.error(f"Error reading stored prices for {ticker}: {e}")
+        return None, None
+
+def save_prices(ticker, prices, coverage):
+    path = get_price_path(ticker)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+
+    table = pa.Table.from_pandas(prices[PRICE_COLUMNS].rename_axis('Date'))
+    metadata = dict(table.schema.metadata or {})
+    metadata[METADATA_KEY] = json.dumps({
+        'start': coverage['start'].strftime('%Y-%m-%d'),
+        'end': coverage['end'].strftime('%Y-%m-%d')
+    })
+
+    try:
+        os.makedirs(PRICE_STORE_DIR, exist_ok=True)
+        pq.write_table(table.replace_schema_metadata(metadata), temp_path)
+        os.replace(temp_path, path)
+    except Exception as e:
+        logging.error(f"Error saving prices for {ticker}: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def is_readjusted(stored, downloaded):
+    """Checks whether bars present in both frames disagree, i.e. the provider re-adjusted history."""
+    overlap = stored.index.intersection(downloaded.index)
+    if overlap.empty:
+        return False
+
+    old_close = stored.loc[overlap, 'Close']
+    new_close = downloaded.loc[overlap, 'Close']
+    return bool(((new_close - old_close).abs() > ADJUSTMENT_TOLERANCE * old_close.abs()).any())
+
+def sync_prices(ticker_list, start_date, end_date, download, offline=False):
+    """
+    Bring the stored history of each ticker up to end_date, asking the provider only for
+    bars that are not stored yet, and return the requested window from the store.
+
+    Parameters:
+    - ticker_list: List of ticker symbols.
+    - start_date, end_date: Window to return, as dates (end exclusive).
+    - download: Function (ticker_list, start_date, end_date) returning a tidy DataFrame
+                (see market_data.tidy_frame), e.g. MarketDataProvider.download.
+    - offline: If True, nothing is downloaded and the window is served from what is stored.
+
+    Returns:
+    - A tidy DataFrame in the same layout as download, sorted by Date and Ticker.
+
+    Note:
+    - The last stored bar is always downloaded again. If its close no longer matches, the
+      provider has re-adjusted the history and the ticker's whole window is fetched again.
+    - Coverage only advances for tickers the provider returned bars for. Tickers it left out
+      (failed or unknown) are requested again on the next call.
+    """
+    start_date = pd.Timestamp(start_date).normalize()
+    end_date = pd.Timestamp(end_date).normalize()
+
+    stored = {}
+    requests = {}
+    for ticker in ticker_list:
+        prices, coverage = load_prices(ticker)
+        stored[ticker] = (prices, coverage)
+
+        if prices is None or prices.empty or coverage['start'] > start_date:
+            requests.setdefault(start_date, []).append(ticker)
+        elif coverage['end'] < end_date:
+            requests.setdefault(prices.index.max(), []).append(ticker)
+
+    if offline:
+        requests = {}
+
+    refetch = []
+    for fetch_start, tickers in requests.items():
+        logging.info(f"Downloading {len(tickers)} tickers from {fetch_start:%Y-%m-%d}...")
+        try:
+            downloaded = download(tickers, fetch_start, end_date)
+        except Exception as e:
+            logging.error(f"Error downloading prices, serving stored data instead: {e}")
+            continue
+
+        for ticker in tickers:
+            prices, coverage = stored[ticker]
+            new_prices = downloaded[downloaded['Ticker'] == ticker][PRICE_COLUMNS].dropna(how='all')
+
+            # A ticker whose download failed keeps its coverage, so its bars are requested again next time.
+            if new_prices.empty:
+                logging.warning(f"No prices downloaded for {ticker}. Its stored coverage is left as is.")
+                continue
+
+            if prices is not None and not prices.empty and coverage['start'] <= start_date:
+                if is_readjusted(prices, new_prices):
+                    logging.info(f"Stored history for {ticker} was re-adjusted by the provider. Fetching it again.")
+                    refetch.append(ticker)
+                    continue
+                new_prices = pd.concat([prices, new_prices])
+                new_start = coverage['start']
+            else:
+                new_start = fetch_start
+
+            new_prices = new_prices[~new_prices.index.duplicated(keep='last')].sort_index()
+            coverage = {'start': new_start, 'end': end_date}
+            save_prices(ticker, new_prices, coverage)
+            stored[ticker] = (new_prices, coverage)
+
+    if refetch:
+        try:
+            downloaded = download(refetch, start_date, end_date)
+            for ticker in refetch:
+                new_prices = downloaded[downloaded['Ticker'] == ticker][PRICE_COLUMNS].dropna(how='all').sort_index()
+                if new_prices.empty:
+                    logging.warning(f"No prices downloaded for {ticker}. Serving its stored data instead.")
+                    continue
+                coverage = {'start': start_date, 'end': end_date}
+                save_prices(ticker, new_prices, coverage)
+                stored[ticker] = (new_prices, coverage)
+        except Exception as e:
+            logging.error(f"Error downloading re-adjusted prices, serving stored data instead: {e}")
+
+    frames = []
+    for ticker in ticker_list:
+        prices, _ = stored[ticker]
+        if prices is None or prices.empty:
+            continue
+        window = prices[(prices.index >= start_date) & (prices.index < end_date)]
+        frames.append(window.assign(Ticker=ticker))
+
+    return tidy_frame(frames)
@@ -0,0 +1,146 @@
+import math
+import numpy as np
+import pandas as pd
+from ..constants import PROMPT_CONTEXT_TOKEN_BUDGET, PROMPT_CONTEXT_RECENT_BARS, PROMPT_CONTEXT_HISTORY_POINTS
+from ..extensions.metrics import PROMPT_CONTEXT_TOKENS
+from .indicators import compute_indicator_matrices
+from .price_series import compact_price_series
+
+# The market analysis prompt gets a digest of the price history rather than every daily close,
+# so its size (and the LLM's latency and cost) stays bounded whatever window the forecast job
+# fetches. Token counts are estimated from the length of the text: numbers and dates make up most
+# of the digest and take about 3 characters per token.
+CHARS_PER_TOKEN = 3
+
+# Trailing returns reported, in trading days.
+RETURN_WINDOWS = {'1 day': 1, '1 week': 5, '1 month': 21, '3 months': 63, '6 months': 126, '1 year': 252}
+TRADING_DAYS_PER_YEAR = 252
+
+# Indicators of indicators.compute_indicator_matrices reported: column -> (label, bars needed)
+INDICATORS = {
+    'MA5': ('5-day moving average', 5),
+    'MA20': ('20-day moving average', 20),
+    'EMA12': ('12-day EMA', 12),
+    'EMA26': ('26-day EMA', 26),
+    'MACD': ('MACD', 26),
+    'Signal': ('MACD signal line', 34),
+    'RSI': ('14-day RSI', 15)
+}
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def to_arrays(series):
+    """Returns the (dates, prices) numpy arrays of a columnar or legacy series."""
+    series = compact_price_series(series)
+    if not series or not series['offsets']:
+        return np.array([], dtype='datetime64[D]'), np.array([], dtype=float)
+
+    dates = np.datetime64(series['start'], 'D') + np.asarray(series['offsets'], dtype=np.int64)
+    return dates, np.asarray(series['prices'], dtype=float)
+
+def sample_indices(count, points):
+    """Returns up to points indices spread evenly over range(count), always including the last one."""
+    if count <= points:
+        return np.arange(count)
+    return np.unique(np.linspace(0, count - 1, points).round().astype(int))
+
+def format_bars(dates, prices, indices):
+    return ", ".join(f"{dates[i]}: {prices[i]:.2f}" for i in indices)
+
+def describe_history(dates, prices):
+    """Returns the lines of the digest that do not depend on the size budget."""
+    lines = [f"Price history: {len(prices)} trading days from {dates[0]} to {dates[-1]}; last close {prices[-1]:.2f} on {dates[-1]}."]
+
+    high, low = int(np.argmax(prices)), int(np.argmin(prices))
+    lines.append(f"Range: high {prices[high]:.2f} on {dates[high]}, low {prices[low]:.2f} on {dates[low]}.")
+
+    returns = [
+        f"{label} {(prices[-1] / prices[-1 - days] - 1) * 100:+.2f}%"
+        for label, days in RETURN_WINDOWS.items() if days < len(prices)
+    ]
+    if len(prices) > 1:
+        returns.append(f"whole period {(prices[-1] / prices[0] - 1) * 100:+.2f}%")
+        lines.append(f"Returns: {', '.join(returns)}.")
+
+    indicators = compute_indicator_matrices(pd.DataFrame({'close': prices}, index=pd.DatetimeIndex(dates)))
+    volatility = indicators['Volatility']['close'].iloc[-1]
+    if np.isfinite(volatility):
+        lines.append(
+            f"Volatility: {volatility:.2f}% daily standard deviation of returns over 21 days "
+            f"({volatility * math.sqrt(TRADING_DAYS_PER_YEAR):.1f}% annualized)."
+        )
+
+    latest = [
+        f"{label} {indicators[column]['close'].iloc[-1]:.2f}"
+        for column, (label, bars) in INDICATORS.items()
+        if len(prices) >= bars and np.isfinite(indicators[column]['close'].iloc[-1])
+    ]
+    if latest:
+        lines.append(f"Latest indicators: {', '.join(latest)}.")
+
+    return lines
+
+def build_price_context(stock_prices, predicted_prices, token_budget=PROMPT_CONTEXT_TOKEN_BUDGET):
+    """
+    Builds the digest of a ticker's price history and forecast used by the market analysis prompt:
+    summary statistics and indicators, the most recent closes, a downsampled history and the forecast.
+    The recent closes, history and forecast are thinned out until the estimated size fits token_budget.
+
+    Parameters:
+        stock_prices (dict | list): The stored price series, columnar or legacy rows.
+        predicted_prices (dict | list): The stored forecast series, columnar or legacy rows.
+        token_budget (int): The estimated number of tokens the digest should not exceed.
+
+    Returns:
+        str: The digest.
+    """
+    dates, prices = to_arrays(stock_prices)
+    forecast_dates, forecast_prices = to_arrays(predicted_prices)
+
+    summary = describe_history(dates, prices) if len(prices) else ["Price history: not available."]
+
+    recent_bars = min(PROMPT_CONTEXT_RECENT_BARS, len(prices))
+    history_points = PROMPT_CONTEXT_HISTORY_POINTS
+    forecast_points = len(forecast_prices)
+
+    while True:
+        lines = list(summary)
+        if recent_bars:
+            lines.append(f"Last {recent_bars} closes: {format_bars(dates, prices, range(len(prices) - recent_bars, len(prices)))}.")
+
+        # The history before the recent closes, sampled evenly
+        older = len(prices) - recent_bars
+        if older > 0 and history_points:
+            indices = sample_indices(older, history_points)
+            sampled = " (sampled)" if len(indices) < older else ""
+            lines.append(f"Earlier closes{sampled}: {format_bars(dates, prices, indices)}.")
+
+        if forecast_points:
+            indices = sample_indices(len(forecast_prices), forecast_points)
+            sampled = " (sampled)" if len(indices) < len(forecast_prices) else ""
+            # The forecast covers consecutive calendar days, weekends included
+            lines.append(
+                f"Forecast for the {len(forecast_prices)} days from {forecast_dates[0]} to {forecast_dates[-1]}{sampled}: "
+                f"{format_bars(forecast_dates, forecast_prices, indices)}."
+            )
+        else:
+            lines.append("Forecast: not available.")
+
+        context = "\n".join(lines)
+        if estimate_tokens(context) <= token_budget:
+            break
+
+        # Detail goes from the oldest history first, then the recent closes, then the forecast
+        if history_points:
+            history_points //= 2
+        elif recent_bars:
+            recent_bars //= 2
+        elif forecast_points > 2:
+            forecast_points = max(2, forecast_points // 2)
+        else:
+            break
+
+    PROMPT_CONTEXT_TOKENS.observe(estimate_tokens(context))
+    return context
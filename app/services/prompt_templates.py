@@ -1,10 +1,17 @@
 from langchain.prompts import ChatPromptTemplate
 
+# Part of the key of stored market analyses: bump it whenever the market analysis prompt changes,
+# so analyses written with the previous prompt stop being served.
+MARKET_ANALYSIS_PROMPT_VERSION = 3
+
 def get_market_analysis_template():
     return ChatPromptTemplate.from_messages([
     ('user', '''
-                Given that the stock prices for the past twenty days are: {stock_prices}, and the time-series forecast for the next 7 days
-                are {predicted_prices}, provide a comprehensive market analysis of the stock.
+                Given the following summary of a stock's price history and its time-series forecast:
+
+                {price_context}
+
+                provide a comprehensive market analysis of the stock.
             ''')
     ])
 
@@ -13,8 +20,24 @@ def get_follow_up_template():
         ('user', '''
                     You an assistant that responds to follow up questions based on chat history
         
-                    This is the chat history with the user: {chat_history}\n
+                    This is a summary of the earlier conversation with the user: {summary}\n
+
+                    This is the recent chat history with the user: {chat_history}\n
         
                     This user has a follow up question: {query}
                 ''')
+    ])
+
+def get_summary_template():
+    return ChatPromptTemplate.from_messages([
+        ('user', '''
+                    You keep a running summary of a conversation between a user and a stock advisory assistant
+
+                    This is the summary so far: {summary}\n
+
+                    These are the messages that followed it: {messages}\n
+
+                    Write an updated summary that folds in these messages. Keep the stock discussed, the figures and
+                    conclusions of the market analysis, and the user's questions with the answers given. Be concise.
+                ''')
     ])
\ No newline at end of file
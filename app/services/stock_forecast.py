@@ -1,106 +1,112 @@
 import logging
+import time
+import multiprocessing
 import numpy as np
 import pandas as pd
-import yfinance as yf
-from datetime import datetime, timedelta
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from dateutil.relativedelta import relativedelta
 from pmdarima.arima import auto_arima
 from statsmodels.tsa.arima.model import ARIMA
-from sklearn.preprocessing import StandardScaler
 import warnings
 from statsmodels.tools.sm_exceptions import ConvergenceWarning
+from app.constants import FORECAST_WORKERS, FORECAST_TICKER_TIMEOUT, ARIMA_ORDER_AIC_TOLERANCE, MODEL_REFIT_DAYS, PRICE_STORE_ENABLED, PRICE_STORE_OFFLINE, FORECAST_ENGINE
+from app.services.model_store import load_fitted_model, save_fitted_model, get_cache_key, load_cached_result, save_cached_result, evict_cached_results
+from app.services.indicators import compute_indicators
+from app.services.price_store import sync_prices
+from app.services.market_data import get_provider
+from app.services.fast_forecast import build_batched_arx_models
+from app.extensions.metrics import time_stage
+from app.services.price_series import encode_price_series, encode_series_by_ticker
 
 # Ignore convergence warnings from statsmodels
 warnings.simplefilter("ignore", ConvergenceWarning)
 
 # Set up logging configuration
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-def fetch_stocks_data(ticker_list, time_period):
+def get_period_dates(time_period):
     """
-    Fetch stock data from Yahoo Finance for multiple tickers and transform
-    it into a tidy DataFrame with columns: Open, High, Low, Close, Volume, Ticker.
-    The Date column will be set as the index.
+    Convert a period string into the (start_date, end_date) window to fetch, ending on the
+    most recent trading day.
+
+    Parameters:
+    - time_period: A number followed by 'y', 'm' or 'd' (e.g., '15y', '6m', '30d').
+
+    Returns:
+    - A (start_date, end_date) tuple of datetimes.
+    """
+    # Set end_date to the most recent trading day
+    end_date = datetime.now()
+    # Adjust end_date if today is weekend (market closed)
+    if end_date.weekday() == 5:      # Saturday
+        end_date -= timedelta(days=1)
+    elif end_date.weekday() == 6:    # Sunday
+        end_date -= timedelta(days=2)
+    
+    # Determine the unit and value from the custom_period string.
+    # Expected formats: "15y", "6m", "30d", etc.
+    unit = time_period[-1].lower()
+    try:
+        value = int(time_period[:-1])
+    except ValueError:
+        raise ValueError("Period must be a number followed by 'y', 'm', or 'd' (e.g., '15y', '6m', '30d').")
+    
+    # Calculate the start_date using relativedelta for years and months.
+    if unit == 'y':
+        start_date = end_date - relativedelta(years=value)
+    elif unit == 'm':
+        start_date = end_date - relativedelta(months=value)
+    elif unit == 'd':
+        start_date = end_date - timedelta(days=value)
+    else:
+        raise ValueError("Invalid period format. Use a number followed by 'y' (years), 'm' (months), or 'd' (days).")
+
+    return start_date, end_date
+
+@time_stage('fetch_stocks_data')
+def fetch_stocks_data(ticker_list, time_period, use_store=None, provider=None):
+    """
+    Fetch stock data for multiple tickers from the configured market data provider
+    (see market_data.get_provider) and transform it into a tidy DataFrame with
+    columns: Open, High, Low, Close, Volume, Ticker. The Date column will be set as the index.
     
     Parameters:
     - ticker_list: List of ticker symbols (e.g., ['AAPL', 'GOOG', 'MSFT', 'TSLA'])
     - time_period: '1m', '3m', '6m', or '1y'
+    - use_store: Serve the window from the local price store, downloading only the bars
+                 after the last stored date (see price_store.sync_prices). Defaults to PRICE_STORE_ENABLED.
+    - provider: MarketDataProvider to download from. Defaults to the one named by MARKET_DATA_PROVIDER.
     
     Returns:
-    - Combined DataFrame with data for all tickers, or None if an error occurs.
+    - Combined DataFrame with data for all tickers and the retrieved closing prices per ticker
+      as columnar series (see price_series.encode_price_series), or (None, None) if an error occurs.
     """
     logging.info("Fetching data for multiple tickers...")
+    use_store = PRICE_STORE_ENABLED if use_store is None else use_store
     
     try:
-        # Set end_date to the most recent trading day
-        end_date = datetime.now()
-        # Adjust end_date if today is weekend (market closed)
-        if end_date.weekday() == 5:      # Saturday
-            end_date -= timedelta(days=1)
-        elif end_date.weekday() == 6:    # Sunday
-            end_date -= timedelta(days=2)
-        
-        # Determine the unit and value from the custom_period string.
-        # Expected formats: "15y", "6m", "30d", etc.
-        unit = time_period[-1].lower()
-        try:
-            value = int(time_period[:-1])
-        except ValueError:
-            raise ValueError("Period must be a number followed by 'y', 'm', or 'd' (e.g., '15y', '6m', '30d').")
-        
-        # Calculate the start_date using relativedelta for years and months.
-        if unit == 'y':
-            start_date = end_date - relativedelta(years=value)
-        elif unit == 'm':
-            start_date = end_date - relativedelta(months=value)
-        elif unit == 'd':
-            start_date = end_date - timedelta(days=value)
+        provider = provider or get_provider()
+        start_date, end_date = get_period_dates(time_period)
+
+        if use_store:
+            df = sync_prices(ticker_list, start_date, end_date, provider.download, offline=PRICE_STORE_OFFLINE)
         else:
-            raise ValueError("Invalid period format. Use a number followed by 'y' (years), 'm' (months), or 'd' (days).")
-        
-        # Download data for all tickers at once
-        df = yf.download(
-            ticker_list,
-            start=start_date.strftime('%Y-%m-%d'),
-            end=end_date.strftime('%Y-%m-%d'),
-            progress=False
-        )
+            df = provider.download(ticker_list, start_date, end_date)
         
         if df.empty:
             logging.warning("No data found for provided tickers.")
-            return None
+            return None, None
 
-        # When multiple tickers are passed, yfinance returns a MultiIndex on columns.
-        # Stack the data into a long (tidy) format.
-        df = df.stack(level=1, future_stack=True).rename_axis(['Date', 'Ticker']).reset_index()
-        
-         # Remove any unwanted column name (e.g. "Price") from the columns Index.
-        df.columns.name = None
-        
-        # Set the Date column as the index for easier time series analysis.
-        df['Date'] = pd.to_datetime(df['Date'])
-        df = df.set_index('Date')
-        
-        # Optionally, reorder columns if desired (e.g., Ticker as a column, then Open, High, Low, Close, Volume)
-        df = df[['Ticker', 'Open', 'High', 'Low', 'Close', 'Volume']]
-
-        retrieved_stocks = {}
-
-        for ticker in df['Ticker'].unique():
-            df_ticker = df[df['Ticker'] == ticker]
-            retrieved_stocks[ticker] = [
-                {"date": date.strftime("%Y-%m-%d"), "price": round(close, 2)}
-                for date, close in zip(df_ticker.index, df_ticker['Close'])
-            ]
+        retrieved_stocks = encode_series_by_ticker(df, 'Close')
         
         logging.info("Successfully fetched and transformed data for multiple tickers.")
         return df, retrieved_stocks
     
     except Exception as e:
         logging.error(f"Error fetching data for multiple tickers: {e}")
-        return None
+        return None, None
     
 
+@time_stage('preprocess_data')
 def preprocess_data(df):
     """
     Preprocess stock data (with Date as the index) and calculate technical indicators
@@ -115,8 +121,8 @@ def preprocess_data(df):
       or None if an error occurs.
     
     Note:
-    - The grouping by 'Ticker' ensures that rolling calculations and standardization are applied
-      within each stock's own time series.
+    - Rolling calculations and standardization are applied within each stock's own time series,
+      with each ticker held in its own column of a date x ticker matrix (see indicators.compute_indicators).
     """
     logging.info("Preprocessing data and calculating technical indicators...")
     
@@ -125,52 +131,9 @@ def preprocess_data(df):
         if not isinstance(df.index, pd.DatetimeIndex):
             df.index = pd.to_datetime(df.index)
         
-        # Forward-fill missing values
-        df = df.ffill()
-        
-        # Define a function to compute technical indicators for a single ticker's data.
-        def compute_indicators(sub_df):
-            # Sort the data by index (date) for correct rolling calculations.
-            sub_df = sub_df.sort_index()
-            
-            # Calculate moving averages (MA5, MA20) with minimum periods equal to the window size.
-            sub_df['MA5'] = sub_df['Close'].rolling(window=5, min_periods=5).mean()
-            sub_df['MA20'] = sub_df['Close'].rolling(window=20, min_periods=20).mean()
-            
-            # Calculate MACD: EMA12, EMA26, MACD, and Signal line.
-            sub_df['EMA12'] = sub_df['Close'].ewm(span=12, adjust=False).mean()
-            sub_df['EMA26'] = sub_df['Close'].ewm(span=26, adjust=False).mean()
-            sub_df['MACD'] = sub_df['EMA12'] - sub_df['EMA26']
-            sub_df['Signal'] = sub_df['MACD'].ewm(span=9, adjust=False).mean()
-            
-            # Calculate RSI over a 14-day window.
-            delta = sub_df['Close'].diff()
-            gain = delta.where(delta > 0, 0)
-            loss = -delta.where(delta < 0, 0)
-            avg_gain = gain.rolling(window=14, min_periods=14).mean()
-            avg_loss = loss.rolling(window=14, min_periods=14).mean()
-            rs = avg_gain / avg_loss
-            sub_df['RSI'] = 100 - (100 / (1 + rs))
-            
-            # Calculate Daily Returns (percentage change).
-            sub_df['Daily_Return'] = sub_df['Close'].pct_change() * 100
-            
-            # Calculate Volatility: 21-day rolling standard deviation of daily returns.
-            sub_df['Volatility'] = sub_df['Daily_Return'].rolling(window=21, min_periods=21).std()
-            
-            # Standardize selected exogenous variables for this ticker.
-            # These are the variables you'll later use as regressors in your ARIMAX model.
-            exog_standard_cols = ['Open', 'Volume', 'MA20', 'Signal', 'RSI', 'Daily_Return', 'Volatility']
-            scaler = StandardScaler()
-            # Fit and transform only if there are enough non-NA values.
-            sub_df[exog_standard_cols] = scaler.fit_transform(sub_df[exog_standard_cols])
-            
-            return sub_df
-        
-        # Group the data by 'Ticker' and apply the technical indicator calculations and standardization.
-        # Using include_groups=False to avoid including the grouping column in the transformation.
-        #df = df.groupby('Ticker').apply(compute_indicators, include_groups=False)
-        df = df.groupby('Ticker', group_keys=False).apply(compute_indicators)
+        # Compute the technical indicators and standardize the exogenous variables for
+        # all tickers at once on date x ticker matrices.
+        df = compute_indicators(df)
         
         # Drop rows with NaN values that result from the rolling calculations.
         df_clean = df.dropna().copy()
@@ -181,7 +144,129 @@ def preprocess_data(df):
     except Exception as e:
         logging.error(f"Error during preprocessing: {e}")
         return None
-def build_arimax_model(df, forecast_days=7, exog_cols=None):
+def select_arimax_order(y, X):
+    """
+    Run the stepwise auto_arima search for the best ARIMAX (p, d, q) order.
+
+    Parameters:
+    - y: Target series (closing prices) as a NumPy array.
+    - X: Exogenous regressors as a NumPy array.
+
+    Returns:
+    - The selected order as a (p, d, q) tuple.
+    """
+    model = auto_arima(
+        y,
+        exogenous=X,
+        start_p=1, start_q=1,
+        max_p=3, max_q=3,
+        d=1,
+        seasonal=False,
+        trace=True,
+        error_action='ignore',
+        suppress_warnings=True,
+        stepwise=True,
+        maxiter=100,  # Increase max iterations
+        method='nm'  # Try Nelder-Mead optimizer
+    )
+    order = model.order
+    logging.info(f"Best ARIMAX model order: {order}")
+    return order
+
+def extend_fitted_model(stored, df, exog_cols, order=None):
+    """
+    Extend a ticker's stored ARIMAX results with the bars that arrived since it was saved,
+    filtering forward with the already estimated parameters instead of refitting.
+
+    Parameters:
+    - stored: The entry saved by build_arimax_model (see model_store), or None.
+    - df: Preprocessed DataFrame for the ticker, with Date as the index.
+    - exog_cols: Exogenous columns the new model should use.
+    - order: The order the caller expects, if known. A stored model with another order is not reused.
+
+    Returns:
+    - The extended results object, or None if the stored model is missing, older than
+      MODEL_REFIT_DAYS, built on other columns or an other order, or does not line up with df.
+
+    Note:
+    - Exogenous variables are standardized over each run's whole window, so appended rows are
+      scaled slightly differently from the ones the parameters were estimated on. The staleness
+      threshold bounds how long that drift can build up before a full refit.
+    """
+    if stored is None or MODEL_REFIT_DAYS <= 0:
+        return None
+
+    if datetime.now(timezone.utc) - stored['fitted_at'] > timedelta(days=MODEL_REFIT_DAYS):
+        return None
+
+    if stored['exog_cols'] != list(exog_cols) or (order is not None and tuple(order) != stored['order']):
+        return None
+
+    last_date = stored['last_date']
+    if last_date not in df.index:
+        return None
+
+    new_rows = df[df.index > last_date]
+    if new_rows.empty:
+        return stored['result']
+
+    try:
+        return stored['result'].append(new_rows['Close'].values, exog=new_rows[exog_cols].values)
+    except Exception as e:
+        logging.warning(f"Could not extend stored ARIMAX model, refitting instead: {e}")
+        return None
+
+def forecast_arimax_result(arimax_result, last_exog, last_date, current_price, forecast_days=7):
+    """
+    Forecast the 'Close' price from a fitted ARIMAX results object.
+
+    Parameters:
+    - arimax_result: Fitted statsmodels ARIMA results.
+    - last_exog: The last observed row of exogenous variables, held constant over the forecast period.
+    - last_date: The date of the last observation.
+    - current_price: The last observed closing price.
+    - forecast_days: Number of days to forecast (default is 7).
+
+    Returns:
+    - A dictionary with 'forecast', 'forecast_dates', 'confidence_intervals', 'trend',
+      'expected_return' and 'current_price' (see build_arimax_model).
+    """
+    forecast_exog = np.repeat(np.asarray(last_exog).reshape(1, -1), forecast_days, axis=0)
+
+    # Generate forecasts using the fitted ARIMAX model.
+    forecast_results = arimax_result.get_forecast(steps=forecast_days, exog=forecast_exog)
+    forecast = forecast_results.predicted_mean
+    conf_int = forecast_results.conf_int(alpha=0.05)
+
+    # Extract confidence intervals whether conf_int is a DataFrame or a NumPy array.
+    if isinstance(conf_int, pd.DataFrame):
+        lower_bounds = conf_int.iloc[:, 0].values
+        upper_bounds = conf_int.iloc[:, 1].values
+    else:
+        lower_bounds = conf_int[:, 0]
+        upper_bounds = conf_int[:, 1]
+
+    # Generate forecast dates based on the last observed date.
+    forecast_dates = [(last_date + timedelta(days=i+1)).strftime('%Y-%m-%d') for i in range(forecast_days)]
+
+    # Calculate the expected return and trend based on the last observed price.
+    expected_return = ((forecast[-1] - current_price) / current_price) * 100
+    trend = "UPWARD" if forecast[-1] > current_price else "DOWNWARD" if forecast[-1] < current_price else "NEUTRAL"
+
+    return {
+        'forecast': forecast,
+        'forecast_dates': forecast_dates,
+        'confidence_intervals': {
+            'lower': lower_bounds,
+            'upper': upper_bounds
+        },
+        'trend': trend,
+        'expected_return': expected_return,
+        'current_price': current_price
+    }
+
+@time_stage('build_arimax_model')
+def build_arimax_model(df, forecast_days=7, exog_cols=None, order=None, reference_aic=None, ticker=None):
     """
     Build an ARIMAX model using specified exogenous variables (technical indicators)
     to forecast the 'Close' price for a given stock. The DataFrame should have Date as index.
@@ -192,6 +277,18 @@ def build_arimax_model(df, forecast_days=7, exog_cols=None):
     - forecast_days: Number of days to forecast (default is 7).
     - exog_cols: List of column names to be used as exogenous regressors.
                  If None, defaults to ['RSI', 'MACD', 'Volatility'].
+    - order: A previously selected (p, d, q) order. If given, the auto_arima search is skipped
+             and the model is fitted directly with this order. If None, the order is searched, and
+             neither the cache nor the stored model is reused.
+    - reference_aic: The AIC recorded when order was selected. If the model's AIC (whether it was
+                     fitted, extended or cached) is worse by more than ARIMA_ORDER_AIC_TOLERANCE,
+                     the order search is run again.
+    - ticker: If given, the fitted results are saved to the model store, and the next call for the
+              same ticker and order extends them with new bars instead of refitting (see
+              extend_fitted_model).
+
+    Fitted results are also kept in a content-addressed cache (see model_store.get_cache_key), so
+    fitting the same input window again with the same order skips fitting entirely.
 
     Returns:
     - A dictionary containing:
@@ -201,7 +298,9 @@ def build_arimax_model(df, forecast_days=7, exog_cols=None):
       - 'trend': A simple label ("UPWARD", "DOWNWARD", or "NEUTRAL") based on the forecast.
       - 'expected_return': The percentage change from current price to the forecasted price.
       - 'current_price': The last observed closing price.
-      - 'model_info': A dictionary with details (order and AIC) of the fitted ARIMAX model.
+      - 'model_info': A dictionary with details (order, AIC, whether the order was searched, whether
+                      the stored model was extended incrementally and whether the fit came from the
+                      cache) of the fitted ARIMAX model.
     """
 
     logging.info("Building ARIMAX model and generating forecasts...")
@@ -215,90 +314,231 @@ def build_arimax_model(df, forecast_days=7, exog_cols=None):
         y = df['Close'].values
         X = df[exog_cols].values
         
-        # Use auto_arima to select the best ARIMAX model order using the exogenous regressors.
-        model = auto_arima(
-            y,
-            exogenous=X,
-            start_p=1, start_q=1,
-            max_p=3, max_q=3,
-            d=1,
-            seasonal=False,
-            trace=True,
-            error_action='ignore',
-            suppress_warnings=True,
-            stepwise=True,
-            maxiter=100,  # Increase max iterations
-            method='nm'  # Try Nelder-Mead optimizer
-        )
-        order = model.order
-        logging.info(f"Best ARIMAX model order: {order}")
-        
-        # Fit the ARIMAX model using the selected order.
-        arimax_model = ARIMA(y, order=order, exog=X)
-        arimax_result = arimax_model.fit()
-        
+        # Without an order, the caller's order search is due: the order is searched and fitted from
+        # scratch. With one, a cached fit of the same ticker, window, columns and order is reused,
+        # or else the stored model is extended if it was fitted with that order.
+        cached = load_cached_result(get_cache_key(ticker, df, exog_cols, order)) if order else None
+        stored = load_fitted_model(ticker) if ticker and order else None
+
+        cache_hit = cached is not None
+        incremental = False
+        order_searched = False
+
+        if cache_hit:
+            arimax_result = cached['result']
+            fitted_at = cached['fitted_at']
+            logging.info(f"Reusing cached ARIMAX model {order} for unchanged input data.")
+        else:
+            # Extend the model stored by the previous run with the new bars if it is recent enough,
+            # otherwise fit from scratch.
+            arimax_result = extend_fitted_model(stored, df, exog_cols, order)
+            incremental = arimax_result is not None
+
+            if incremental:
+                fitted_at = stored['fitted_at']
+                logging.info(f"Extended stored ARIMAX model {order} to {df.index[-1]:%Y-%m-%d} without refitting.")
+            else:
+                order_searched = order is None
+                if order_searched:
+                    order = select_arimax_order(y, X)
+
+                # Fit the ARIMAX model using the selected order.
+                arimax_result = ARIMA(y, order=order, exog=X).fit()
+                fitted_at = datetime.now(timezone.utc)
+
+        # A cached order is only trusted while it fits about as well as when it was chosen, whether
+        # the model was refitted, extended or taken from the cache.
+        if not order_searched and reference_aic is not None and arimax_result.aic > reference_aic + ARIMA_ORDER_AIC_TOLERANCE:
+            logging.info(f"AIC worsened from {reference_aic:.2f} to {arimax_result.aic:.2f} with cached order {order}. Searching again...")
+            order = select_arimax_order(y, X)
+            order_searched = True
+            cache_hit = incremental = False
+            arimax_result = ARIMA(y, order=order, exog=X).fit()
+            fitted_at = datetime.now(timezone.utc)
+
+        if not cache_hit:
+            save_cached_result(get_cache_key(ticker, df, exog_cols, order), {
+                'result': arimax_result,
+                'order': tuple(order),
+                'fitted_at': fitted_at
+            })
+
         # For forecasting, we need exogenous values for the forecast period.
         # We assume that the exogenous variables remain constant at their last observed values.
-        last_exog = X[-1, :].reshape(1, -1)  # shape (1, number_of_exog)
-        forecast_exog = np.repeat(last_exog, forecast_days, axis=0)
-        
-        # Generate forecasts using the fitted ARIMAX model.
-        forecast_results = arimax_result.get_forecast(steps=forecast_days, exog=forecast_exog)
-        forecast = forecast_results.predicted_mean
-        conf_int = forecast_results.conf_int(alpha=0.05)
-        
-        # Extract confidence intervals whether conf_int is a DataFrame or a NumPy array.
-        if isinstance(conf_int, pd.DataFrame):
-            lower_bounds = conf_int.iloc[:, 0].values
-            upper_bounds = conf_int.iloc[:, 1].values
-        else:
-            lower_bounds = conf_int[:, 0]
-            upper_bounds = conf_int[:, 1]
-        
-        # Generate forecast dates based on the last date in the DataFrame's index.
+        last_exog = X[-1, :]
         last_date = pd.to_datetime(df.index[-1])
-        forecast_dates = [(last_date + timedelta(days=i+1)).strftime('%Y-%m-%d') for i in range(forecast_days)]
-        
-        # Calculate the expected return and trend based on the last observed price.
         current_price = y[-1]
-        expected_return = ((forecast[-1] - current_price) / current_price) * 100
-        trend = "UPWARD" if forecast[-1] > current_price else "DOWNWARD" if forecast[-1] < current_price else "NEUTRAL"
-        
-        prediction_results = {
-            'forecast': forecast,
-            'forecast_dates': forecast_dates,
-            'confidence_intervals': {
-                'lower': lower_bounds,
-                'upper': upper_bounds
-            },
-            'trend': trend,
-            'expected_return': expected_return,
-            'current_price': current_price,
-            'model_info': {
-                'arimax_order': order,
-                'aic': arimax_result.aic
-            }
+
+        if ticker:
+            save_fitted_model(ticker, {
+                'result': arimax_result,
+                'order': tuple(order),
+                'exog_cols': list(exog_cols),
+                'last_date': last_date,
+                'last_exog': last_exog,
+                'current_price': current_price,
+                'fitted_at': fitted_at
+            })
+
+        prediction_results = forecast_arimax_result(arimax_result, last_exog, last_date, current_price, forecast_days)
+        prediction_results['model_info'] = {
+            'arimax_order': order,
+            'aic': arimax_result.aic,
+            'order_searched': order_searched,
+            'incremental': incremental,
+            'cached': cache_hit
         }
         
-        logging.info(f"Forecast complete. Trend: {trend}, Expected return: {expected_return:.2f}%")
+        logging.info(f"Forecast complete. Trend: {prediction_results['trend']}, Expected return: {prediction_results['expected_return']:.2f}%")
         return prediction_results
 
     except Exception as e:
         logging.error(f"Error during ARIMAX model building: {e}")
         return None
+
+@time_stage('build_arimax_models')
+def build_arimax_models(df, ticker_list, forecast_days=7, exog_cols=None, workers=None, timeout=None, orders=None):
+    """
+    Build ARIMAX forecasts for several tickers, spreading the per-ticker auto_arima
+    search and ARIMA fit across a pool of worker processes.
+
+    Parameters:
+    - df: Preprocessed DataFrame for all tickers, with Date as the index and a 'Ticker' column.
+    - ticker_list: Tickers to forecast. The result keeps this order.
+    - forecast_days: Number of days to forecast (default is 7).
+    - exog_cols: List of column names to be used as exogenous regressors (see build_arimax_model).
+    - workers: Number of worker processes. Defaults to FORECAST_WORKERS; 1 fits sequentially
+               in the current process.
+    - timeout: Seconds allowed for a single ticker once it starts fitting. Defaults to
+               FORECAST_TICKER_TIMEOUT. Ignored when fitting sequentially.
+    - orders: Optional dict mapping tickers to a cached {'order': (p, d, q), 'aic': float}.
+              Tickers with a cached order skip the auto_arima search (see build_arimax_model).
+
+    Returns:
+    - A dictionary keyed by ticker, in ticker_list order, whose values are the
+      build_arimax_model result, or None if the ticker had no data, failed or timed out.
+
+    The model cache is trimmed to MODEL_CACHE_MAX_MB once all tickers are fitted.
+    """
+    workers = FORECAST_WORKERS if workers is None else workers
+    timeout = FORECAST_TICKER_TIMEOUT if timeout is None else timeout
+    orders = orders or {}
+
+    def model_args(ticker, df_ticker):
+        cached = orders.get(ticker) or {}
+        return (df_ticker, forecast_days, exog_cols, cached.get('order'), cached.get('aic'), ticker)
+
+    ticker_frames = {}
+    for ticker in ticker_list:
+        df_ticker = df[df['Ticker'] == ticker].sort_index()
+        if df_ticker.empty:
+            logging.warning(f"No valid data for {ticker}. Skipping.")
+            continue
+        ticker_frames[ticker] = df_ticker
+
+    results = {}
+
+    if workers <= 1 or len(ticker_frames) <= 1:
+        for ticker, df_ticker in ticker_frames.items():
+            logging.info(f"Processing ARIMAX model for {ticker}...")
+            results[ticker] = build_arimax_model(*model_args(ticker, df_ticker))
+        evict_cached_results()
+        return {ticker: results.get(ticker) for ticker in ticker_list}
+
+    workers = min(workers, len(ticker_frames))
+    logging.info(f"Fitting ARIMAX models for {len(ticker_frames)} tickers on {workers} processes...")
+
+    # Workers are spawned rather than forked so they don't inherit the scheduler's
+    # threads or the app's database connections.
+    context = multiprocessing.get_context('spawn')
+    pool = context.Pool(processes=workers)
+
+    # Only as many tickers as there are free processes are in flight at once, so a
+    # ticker starts fitting as soon as it is submitted and its deadline is fair.
+    # A ticker that times out keeps its process busy; that slot is written off and
+    # the pool is replaced once every slot is stuck.
+    queue = list(ticker_frames.items())
+    in_flight = {}
+    capacity = workers
+
+    try:
+        while queue or in_flight:
+            while queue and len(in_flight) < capacity:
+                ticker, df_ticker = queue.pop(0)
+                logging.info(f"Processing ARIMAX model for {ticker}...")
+                async_result = pool.apply_async(build_arimax_model, model_args(ticker, df_ticker))
+                in_flight[ticker] = (async_result, time.monotonic() + timeout)
+
+            for ticker, (async_result, deadline) in list(in_flight.items()):
+                if async_result.ready():
+                    del in_flight[ticker]
+                    try:
+                        results[ticker] = async_result.get()
+                    except Exception as e:
+                        logging.error(f"ARIMAX worker failed for {ticker}: {e}")
+                elif time.monotonic() > deadline:
+                    del in_flight[ticker]
+                    capacity -= 1
+                    logging.error(f"ARIMAX model for {ticker} timed out after {timeout}s. Skipping.")
+
+            if capacity == 0 and queue:
+                logging.warning("All ARIMAX workers are stuck on timed out tickers. Restarting the pool...")
+                pool.terminate()
+                pool = context.Pool(processes=workers)
+                capacity = workers
+
+            time.sleep(0.05)
+    finally:
+        pool.terminate()
+
+    # The fits only add to the model cache, so it is trimmed back to size once per run.
+    evict_cached_results()
+
+    return {ticker: results.get(ticker) for ticker in ticker_list}
+@time_stage('build_forecast_models')
+def build_forecast_models(df, ticker_list, forecast_days=7, exog_cols=None, engine=None, orders=None):
+    """
+    Forecast every ticker with the selected engine.
+
+    Parameters:
+    - engine: 'arimax' for per-ticker ARIMAX models (build_arimax_models), or 'fast' for the
+              batched fixed-order ARX screening engine (fast_forecast.build_batched_arx_models).
+              Defaults to FORECAST_ENGINE.
+    - orders: Cached ARIMA orders per ticker, used by the 'arimax' engine only.
+    - The other parameters are passed through to the engine.
+
+    Returns:
+    - A dictionary keyed by ticker, in ticker_list order, with the engine's results (or None).
+    """
+    engine = (engine or FORECAST_ENGINE).lower()
+
+    if engine == 'fast':
+        return build_batched_arx_models(df, ticker_list, forecast_days=forecast_days, exog_cols=exog_cols)
+    if engine == 'arimax':
+        return build_arimax_models(df, ticker_list, forecast_days=forecast_days, exog_cols=exog_cols, orders=orders)
+
+    raise ValueError(f"Unknown forecast engine '{engine}'. Use 'arimax' or 'fast'.")
+
 # ----------------------------
 # Pipeline to Process and Forecast for Each Stock
 # ----------------------------
-def run_pipeline(ticker_list, time_period, forecast_days=7, exog_cols=None):
+@time_stage('run_pipeline')
+def run_pipeline(ticker_list, time_period, forecast_days=7, exog_cols=None, orders=None, engine=None):
     """
-    Complete pipeline: Fetch data, preprocess it, and build ARIMAX forecasts for each ticker.
+    Complete pipeline: Fetch data, preprocess it, and forecast each ticker with the selected engine.
     
     Parameters:
-    - preprocessed_df: DataFrame with Date as index and columns including 'Ticker' and 'Close'.
+    - ticker_list: Tickers to fetch and forecast.
+    - time_period: Window of history to fetch, e.g. '6m' or '15y' (see get_period_dates).
     - forecast_days: Number of days to forecast (default is 7).
+    - exog_cols: List of column names to be used as exogenous regressors (see build_arimax_model).
+    - orders: Optional cached ARIMA orders per ticker, used by the 'arimax' engine only (see build_arimax_models).
+    - engine: 'arimax' or 'fast' (see build_forecast_models). Defaults to FORECAST_ENGINE.
     
     Returns:
-    - A dictionary where keys are ticker symbols and values are the forecast results dictionary.
+    - A (retrieved_data, predictions) tuple: the retrieved closing prices per ticker (see fetch_stocks_data) and
+      the encoded forecast series per ticker (see price_series.encode_price_series), or None if no data
+      could be fetched or preprocessed.
     """
     # Fetch raw data
     raw_data, retrieved_data = fetch_stocks_data(ticker_list, time_period)
@@ -312,36 +552,17 @@ def run_pipeline(ticker_list, time_period, forecast_days=7, exog_cols=None):
         logging.error("Preprocessing failed. Pipeline aborted.")
         return None
         
-    predictions = {}
-    
-    # Get the unique tickers present in the DataFrame.
+    # Fit a model for each ticker present in the DataFrame with the selected engine.
     tickers = preprocessed_data['Ticker'].unique()
-    
-    for ticker in tickers:
-        logging.info(f"Building prediction for {ticker}...")
-        # Select data for the ticker.
-        df_ticker = preprocessed_data[preprocessed_data['Ticker'] == ticker].copy()
-        
-        # Ensure the DataFrame is sorted by date.
-        df_ticker = df_ticker.sort_index()
-        
-        # Call the prediction model function for this ticker.
-        pred = build_arimax_model(df_ticker, forecast_days=forecast_days, exog_cols=exog_cols)
-        predictions[ticker] = pred
-
-    print('predictions')
-    print(predictions)
-    print('\n')
-
+    predictions = build_forecast_models(preprocessed_data, tickers, forecast_days=forecast_days, exog_cols=exog_cols, engine=engine, orders=orders)
 
     formatted_predictions = {}
 
     for ticker, data in predictions.items():
+        if data is None:
+            continue
 
-        formatted_predictions[ticker] = [
-            {"date": date, "price": round(price, 2)}
-            for date, price in zip(data["forecast_dates"], data["forecast"])
-        ]
+        formatted_predictions[ticker] = encode_price_series(data["forecast_dates"], data["forecast"])
 
     return retrieved_data, formatted_predictions
 
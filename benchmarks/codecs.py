@@ -0,0 +1,75 @@
+"""
+Benchmark of the codecs used for stored forecast payloads.
+
+Encodes the close history of synthetic tickers, in the columnar and the legacy row layout
+(see app/services/price_series.py), with jsonpickle, the standard json module and the orjson
+codec of the JSON columns, and reports the time to encode and decode one payload and its size:
+
+    python -m benchmarks.codecs --years 15 --tickers 20
+"""
+import sys
+import json
+import time
+import argparse
+import jsonpickle
+from benchmarks.synthetic import generate_ohlcv
+from app.extensions import json_codec
+from app.services.price_series import encode_series_by_ticker, expand_price_series
+
+BUSINESS_DAYS_PER_YEAR = 252
+
+CODECS = {
+    'jsonpickle': (jsonpickle.encode, jsonpickle.decode),
+    'json': (json.dumps, json.loads),
+    'orjson': (json_codec.dumps, json_codec.loads)
+}
+
+
+def best_time(function, values, repeat):
+    """Returns the best of repeat runs of the mean seconds per call of function over values."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for value in values:
+            function(value)
+        timings.append((time.perf_counter() - started) / len(values))
+    return min(timings)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark of the forecast payload codecs.")
+    parser.add_argument('--years', type=int, default=15, help="Years of daily history per payload.")
+    parser.add_argument('--tickers', type=int, default=20, help="Number of payloads encoded per run.")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per measurement; the best is reported.")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the synthetic universe.")
+    parser.add_argument('--output', help="Write the results as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    df = generate_ohlcv(args.tickers, args.years * BUSINESS_DAYS_PER_YEAR, seed=args.seed)
+    columnar = list(encode_series_by_ticker(df).values())
+    layouts = {
+        'columnar': columnar,
+        'rows': [expand_price_series(series) for series in columnar]
+    }
+
+    results = {}
+    print(f"{'layout':<10} {'codec':<12} {'encode ms':>10} {'decode ms':>10} {'KB':>10}")
+    for layout, payloads in layouts.items():
+        for codec, (encode, decode) in CODECS.items():
+            encoded = [encode(payload) for payload in payloads]
+            stats = {
+                'encode_ms': best_time(encode, payloads, args.repeat) * 1000,
+                'decode_ms': best_time(decode, encoded, args.repeat) * 1000,
+                'kb': sum(len(value) for value in encoded) / len(encoded) / 1024
+            }
+            results[f'{layout}/{codec}'] = stats
+            print(f"{layout:<10} {codec:<12} {stats['encode_ms']:>10.3f} {stats['decode_ms']:>10.3f} {stats['kb']:>10.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'years': args.years, 'tickers': args.tickers, 'results': results}, file, indent=2)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
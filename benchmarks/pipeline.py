@@ -0,0 +1,223 @@
+"""
+Offline benchmark of the forecasting pipeline.
+
+Generates a seeded synthetic universe per size, serves it through the file market data
+provider, and times each pipeline stage, recording its peak traced memory:
+
+    python -m benchmarks.pipeline --sizes small medium --output results.json
+    python -m benchmarks.pipeline --baseline results.json --threshold 0.2
+
+With --baseline, the run exits with status 1 if any stage is slower, or uses more memory,
+than the baseline by more than the threshold.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from datetime import datetime, timezone
+
+# Universe sizes: tickers, fetched window, how many tickers the ARIMAX stage fits, and how many
+# the ARIMAX (default engine) pipeline runs on (auto_arima costs seconds per ticker, so both are
+# timed on a subset, and the pipeline only on the small size).
+SIZES = {
+    'small': {'tickers': 10, 'time_period': '6m', 'arimax_tickers': 2, 'arimax_pipeline_tickers': 2},
+    'medium': {'tickers': 100, 'time_period': '1y', 'arimax_tickers': 4, 'arimax_pipeline_tickers': 0},
+    'large': {'tickers': 1000, 'time_period': '2y', 'arimax_tickers': 8, 'arimax_pipeline_tickers': 0}
+}
+
+# What the recorded numbers cover, written to the JSON results.
+SCOPE = {
+    'seconds': "Wall time of the stage in this process. ARIMAX models are fitted sequentially "
+               "(FORECAST_WORKERS=1), so no worker processes are started.",
+    'peak_mb': "Peak memory allocated through Python (tracemalloc) in this process, which runs every stage.",
+    'run_pipeline_arimax': "Fetch, preprocess and a fresh ARIMAX fit (order search included) per ticker: "
+                           "the model store and cache are cleared before each run."
+}
+
+# Extra business days generated before the fetched window, so it is always fully covered.
+HISTORY_MARGIN_DAYS = 30
+
+BUSINESS_DAYS_PER_YEAR = 252
+
+
+def measure(function, repeat):
+    """
+    Time function over repeat runs and trace the peak memory of one extra run.
+
+    Returns:
+    - (result, stats) where stats has the median and minimum seconds and the peak traced MB.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+
+    # Tracing slows allocations down, so memory is measured on a separate run.
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return result, {
+        'seconds': timings[len(timings) // 2],
+        'min_seconds': timings[0],
+        'peak_mb': peak / 2 ** 20
+    }
+
+def set_up_environment(work_dir):
+    """
+    Point the market data provider and the model stores at work_dir, so the benchmark neither
+    needs the network nor reuses (or pollutes) the stores of a real deployment.
+
+    The app reads these settings when app.constants is imported, so this must run before any
+    app module is imported. ARIMAX models are fitted in this process (FORECAST_WORKERS=1), so
+    the timings leave out worker start up and the traced peak memory covers the fits.
+    """
+    os.environ.update({
+        'MARKET_DATA_PROVIDER': 'file',
+        'MARKET_DATA_FIXTURES_DIR': os.path.join(work_dir, 'fixtures'),
+        'PRICE_STORE_ENABLED': 'false',
+        'MODEL_STORE_DIR': os.path.join(work_dir, 'models'),
+        'MODEL_CACHE_DIR': os.path.join(work_dir, 'model_cache'),
+        'FORECAST_WORKERS': '1'
+    })
+
+def clear_model_stores():
+    for directory in (os.environ['MODEL_STORE_DIR'], os.environ['MODEL_CACHE_DIR']):
+        shutil.rmtree(directory, ignore_errors=True)
+
+def period_business_days(time_period):
+    value, unit = int(time_period[:-1]), time_period[-1].lower()
+    days = {'y': BUSINESS_DAYS_PER_YEAR, 'm': BUSINESS_DAYS_PER_YEAR // 12, 'd': 1}[unit]
+    return value * days + HISTORY_MARGIN_DAYS
+
+def benchmark_size(name, config, repeat, seed):
+    """Run every stage for one universe size and return {stage: stats}."""
+    # Imported here, once main has called set_up_environment, as the app reads its settings on import.
+    from benchmarks.synthetic import generate_ohlcv, write_fixtures
+    from app.services.market_data import FileProvider
+    from app.services.stock_forecast import fetch_stocks_data, preprocess_data, build_arimax_model, build_forecast_models, run_pipeline
+
+    df = generate_ohlcv(config['tickers'], period_business_days(config['time_period']), seed=seed)
+    ticker_list = write_fixtures(df, FileProvider().directory)
+    provider = FileProvider()
+    results = {}
+
+    logging.info(f"Benchmarking '{name}': {len(ticker_list)} tickers over {config['time_period']}...")
+
+    (raw_data, _), results['fetch_stocks_data'] = measure(
+        lambda: fetch_stocks_data(ticker_list, config['time_period'], use_store=False, provider=provider), repeat)
+
+    preprocessed, results['preprocess_data'] = measure(lambda: preprocess_data(raw_data), repeat)
+
+    arimax_tickers = ticker_list[:config['arimax_tickers']]
+    _, results['build_arimax_model'] = measure(
+        lambda: [build_arimax_model(preprocessed[preprocessed['Ticker'] == ticker]) for ticker in arimax_tickers], repeat)
+    results['build_arimax_model']['tickers'] = len(arimax_tickers)
+
+    _, results['build_forecast_models_fast'] = measure(
+        lambda: build_forecast_models(preprocessed, ticker_list, engine='fast'), repeat)
+
+    _, results['run_pipeline_fast'] = measure(
+        lambda: run_pipeline(ticker_list, config['time_period'], engine='fast'), repeat)
+
+    pipeline_tickers = ticker_list[:config['arimax_pipeline_tickers']]
+    if pipeline_tickers:
+        def run_arimax_pipeline():
+            # Stored and cached models are cleared so every run fits them, as after a refit
+            clear_model_stores()
+            return run_pipeline(pipeline_tickers, config['time_period'], engine='arimax')
+
+        _, results['run_pipeline_arimax'] = measure(run_arimax_pipeline, repeat)
+        results['run_pipeline_arimax']['tickers'] = len(pipeline_tickers)
+
+    for stats in results.values():
+        stats['universe'] = {'tickers': len(ticker_list), 'time_period': config['time_period'], 'rows': len(raw_data)}
+
+    return results
+
+def compare(results, baseline, threshold):
+    """
+    Compare a run against a baseline run.
+
+    Returns:
+    - A list of regression messages for stages whose time or peak memory grew by more than
+      threshold (a fraction, e.g. 0.2 for 20%). Stages missing from either run are ignored.
+    """
+    regressions = []
+    for size, stages in results['results'].items():
+        for stage, stats in stages.items():
+            reference = baseline.get('results', {}).get(size, {}).get(stage)
+            if reference is None:
+                continue
+
+            for metric in ('seconds', 'peak_mb'):
+                if reference[metric] > 0 and stats[metric] > reference[metric] * (1 + threshold):
+                    change = (stats[metric] / reference[metric] - 1) * 100
+                    regressions.append(
+                        f"{size}/{stage}: {metric} {reference[metric]:.4f} -> {stats[metric]:.4f} (+{change:.1f}%)")
+    return regressions
+
+def print_table(results):
+    print(f"{'size':<8} {'stage':<28} {'seconds':>10} {'min':>10} {'peak MB':>10}")
+    for size, stages in results['results'].items():
+        for stage, stats in stages.items():
+            print(f"{size:<8} {stage:<28} {stats['seconds']:>10.4f} {stats['min_seconds']:>10.4f} {stats['peak_mb']:>10.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark of the forecasting pipeline.")
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['small'], help="Universe sizes to run.")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per stage; the median is reported.")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the synthetic universe.")
+    parser.add_argument('--output', help="Write the results as JSON to this path.")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against.")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed slowdown or memory growth as a fraction of the baseline.")
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    work_dir = tempfile.mkdtemp(prefix='quantai-bench-')
+    try:
+        set_up_environment(work_dir)
+        results = {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'scope': SCOPE,
+            'results': {size: benchmark_size(size, SIZES[size], max(1, args.repeat), args.seed) for size in args.sizes}
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_table(results)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressions past {args.threshold:.0%}:")
+            print('\n'.join(regressions))
+            return 1
+        print(f"\nNo regressions past {args.threshold:.0%}.")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
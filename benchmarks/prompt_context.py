@@ -0,0 +1,62 @@
+"""
+Benchmark of the price digest put in the market analysis prompt.
+
+For synthetic histories of increasing length, compares the estimated prompt tokens of the legacy
+{"date", "price"} rows with those of the digest built by app/services/prompt_context.py, and the
+time to build the digest:
+
+    python -m benchmarks.prompt_context --budget 600
+"""
+import sys
+import json
+import time
+import argparse
+import numpy as np
+from benchmarks.synthetic import generate_ohlcv
+from app.services.price_series import encode_series_by_ticker, encode_price_series, expand_price_series
+from app.services.prompt_context import build_price_context, estimate_tokens
+
+# Trading days of history: about one month, six months, one, five and fifteen years.
+HISTORY_DAYS = [21, 126, 252, 1260, 3780]
+FORECAST_DAYS = 7
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark of the market analysis price digest.")
+    parser.add_argument('--budget', type=int, default=None, help="Token budget of the digest (default PROMPT_CONTEXT_TOKEN_BUDGET).")
+    parser.add_argument('--repeat', type=int, default=20, help="Digests built per measurement; the best time is reported.")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the synthetic histories.")
+    parser.add_argument('--output', help="Write the results as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    options = {} if args.budget is None else {'token_budget': args.budget}
+    results = {}
+    print(f"{'days':>6} {'raw tokens':>12} {'digest tokens':>14} {'build ms':>10}")
+    for days in HISTORY_DAYS:
+        series = next(iter(encode_series_by_ticker(generate_ohlcv(1, days, seed=args.seed)).values()))
+        last = np.datetime64(series['start'], 'D') + series['offsets'][-1]
+        forecast = encode_price_series(last + np.arange(1, FORECAST_DAYS + 1), np.full(FORECAST_DAYS, series['prices'][-1]))
+
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            context = build_price_context(series, forecast, **options)
+            timings.append(time.perf_counter() - started)
+
+        stats = {
+            'raw_tokens': estimate_tokens(f"{expand_price_series(series)}{expand_price_series(forecast)}"),
+            'digest_tokens': estimate_tokens(context),
+            'build_ms': min(timings) * 1000
+        }
+        results[days] = stats
+        print(f"{days:>6} {stats['raw_tokens']:>12} {stats['digest_tokens']:>14} {stats['build_ms']:>10.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'budget': args.budget, 'results': results}, file, indent=2)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
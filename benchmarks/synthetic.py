@@ -0,0 +1,57 @@
+import os
+import numpy as np
+import pandas as pd
+from app.services.indicators import PRICE_COLUMNS
+from app.services.market_data import tidy_frame
+
+
+def generate_ohlcv(n_tickers, n_days, seed=0, end_date=None):
+    """
+    Generate a reproducible OHLCV universe for benchmarking.
+
+    Closes follow a geometric random walk with a per-ticker drift and volatility. Open, High
+    and Low are drawn around the close, and Volume is lognormal.
+
+    Parameters:
+    - n_tickers: Number of tickers (named SYN0000, SYN0001, ...).
+    - n_days: Number of business days per ticker.
+    - seed: Seed of the random generator. The same seed always gives the same universe.
+    - end_date: Last business day of the series. Defaults to today, so the fixtures cover
+                the windows requested by get_period_dates.
+
+    Returns:
+    - A tidy DataFrame (see market_data.tidy_frame) with Date as index.
+    """
+    rng = np.random.default_rng(seed)
+    end_date = pd.Timestamp(end_date or pd.Timestamp.today()).normalize()
+    dates = pd.bdate_range(end=end_date, periods=n_days, name='Date')
+    shape = (n_days, n_tickers)
+
+    drift = rng.normal(0.0003, 0.0005, n_tickers)
+    volatility = rng.uniform(0.01, 0.03, n_tickers)
+    returns = drift + volatility * rng.standard_normal(shape)
+    close = rng.uniform(20, 500, n_tickers) * np.exp(np.cumsum(returns, axis=0))
+
+    open_ = close * (1 + 0.5 * volatility * rng.standard_normal(shape))
+    high = np.maximum(open_, close) * (1 + np.abs(0.5 * volatility * rng.standard_normal(shape)))
+    low = np.minimum(open_, close) * (1 - np.abs(0.5 * volatility * rng.standard_normal(shape)))
+    volume = np.round(rng.lognormal(14, 0.5, shape))
+
+    tickers = np.array([f"SYN{i:04d}" for i in range(n_tickers)])
+    df = pd.DataFrame({
+        'Date': np.repeat(dates, n_tickers),
+        'Ticker': np.tile(tickers, n_days),
+        'Open': open_.ravel(),
+        'High': high.ravel(),
+        'Low': low.ravel(),
+        'Close': close.ravel(),
+        'Volume': volume.ravel()
+    })
+    return tidy_frame([df.set_index('Date')])
+
+def write_fixtures(df, directory):
+    """Write one <ticker>.parquet file per ticker, in the layout read by market_data.FileProvider."""
+    os.makedirs(directory, exist_ok=True)
+    for ticker, df_ticker in df.groupby('Ticker'):
+        df_ticker[PRICE_COLUMNS].to_parquet(os.path.join(directory, f"{ticker}.parquet"))
+    return sorted(df['Ticker'].unique())
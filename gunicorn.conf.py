@@ -0,0 +1,17 @@
+import os
+import shutil
+import tempfile
+
+# Every worker records its metrics as files in this directory, and /metrics aggregates them
+# (see app/extensions/metrics.py). It has to be set before the workers import the app.
+metrics_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'quantai-metrics'))
+
+
+def on_starting(server):
+    # Samples left over from a previous run would otherwise be reported again.
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,92 @@
+"""store forecast payloads as json
+
+Revision ID: 5f06e29db129
+Revises: dc4087227652
+Create Date: 2026-10-18 19:17:14.675007
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import jsonpickle
+
+
+# revision identifiers, used by Alembic.
+revision = '5f06e29db129'
+down_revision = 'dc4087227652'
+branch_labels = None
+depends_on = None
+
+JSON_PAYLOAD = sa.JSON().with_variant(postgresql.JSONB(), 'postgresql')
+
+# Rows are converted in batches so large tables are never loaded at once.
+BATCH_SIZE = 500
+
+PAYLOAD_COLUMNS = ['retrieved_data', 'forecast']
+
+
+def convert_rows(source_type, target_type, convert):
+    """Copy every payload column into its <column>_new counterpart, converting the values in Python."""
+    stock_forecasts = sa.table(
+        'stock_forecasts',
+        sa.column('id', sa.Integer),
+        *[sa.column(column, source_type) for column in PAYLOAD_COLUMNS],
+        *[sa.column(f'{column}_new', target_type) for column in PAYLOAD_COLUMNS]
+    )
+    connection = op.get_bind()
+    last_id = 0
+    failures = []
+
+    while True:
+        rows = connection.execute(
+            sa.select(stock_forecasts.c.id, *[stock_forecasts.c[column] for column in PAYLOAD_COLUMNS])
+            .where(stock_forecasts.c.id > last_id)
+            .order_by(stock_forecasts.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+
+        for row in rows:
+            try:
+                values = {f'{column}_new': convert(getattr(row, column)) for column in PAYLOAD_COLUMNS}
+            except Exception as e:
+                failures.append(f"{row.id} ({str(e).splitlines()[0]})")
+                continue
+
+            connection.execute(stock_forecasts.update().where(stock_forecasts.c.id == row.id).values(values))
+        last_id = rows[-1].id
+
+    # The columns become NOT NULL, so a row that cannot be converted would fail the migration
+    # there anyway: name every such row instead, to be fixed or deleted before upgrading again.
+    if failures:
+        raise RuntimeError(
+            f"Could not convert the payloads of {len(failures)} stock_forecasts rows: {', '.join(failures[:20])}"
+            + (", ..." if len(failures) > 20 else "")
+        )
+
+def replace_columns(source_type, target_type, convert):
+    with op.batch_alter_table('stock_forecasts', schema=None) as batch_op:
+        for column in PAYLOAD_COLUMNS:
+            batch_op.add_column(sa.Column(f'{column}_new', target_type, nullable=True))
+
+    convert_rows(source_type, target_type, convert)
+
+    with op.batch_alter_table('stock_forecasts', schema=None) as batch_op:
+        for column in PAYLOAD_COLUMNS:
+            batch_op.drop_column(column)
+            batch_op.alter_column(f'{column}_new', new_column_name=column, existing_type=target_type, nullable=False)
+
+def decode_jsonpickle(data):
+    value = jsonpickle.decode(data)
+    if value is None:
+        raise ValueError("payload is empty")
+    return value
+
+
+def upgrade():
+    replace_columns(sa.Text(), JSON_PAYLOAD, decode_jsonpickle)
+
+
+def downgrade():
+    replace_columns(JSON_PAYLOAD, sa.Text(), jsonpickle.encode)
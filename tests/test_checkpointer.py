@@ -0,0 +1,78 @@
+import pytest
+from typing import Annotated
+from typing_extensions import TypedDict
+from sqlalchemy import create_engine, select, func
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import StateGraph, END
+from langgraph.graph.message import add_messages
+from app.extensions import database
+from app.models import GraphCheckpoint, GraphCheckpointBlob, GraphCheckpointWrite
+from app.services.checkpointer import SQLAlchemyCheckpointSaver
+
+TABLES = [GraphCheckpoint.__table__, GraphCheckpointBlob.__table__, GraphCheckpointWrite.__table__]
+TURNS = 13
+# Writes of the last few steps; without pruning the 13 turns leave about 80
+MAX_WRITES = 10
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def reply(state: State):
+    return {'messages': [AIMessage(content=f"reply {len(state['messages'])}")]}
+
+def build_graph(checkpointer):
+    # Two steps per turn, like the chatbot and follow up nodes of the chat graph
+    graph_builder = StateGraph(State)
+    graph_builder.add_node('first', reply)
+    graph_builder.add_node('second', reply)
+    graph_builder.add_edge('first', 'second')
+    graph_builder.add_edge('second', END)
+    graph_builder.set_entry_point('first')
+    return graph_builder.compile(checkpointer=checkpointer)
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'checkpoints.db'}")
+    database.metadata.create_all(engine, tables=TABLES)
+    return engine
+
+def count(engine, table, *conditions):
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(table).where(*conditions)).scalar()
+
+def run_turns(saver, thread_id, turns):
+    graph = build_graph(saver)
+    config = {'configurable': {'thread_id': thread_id}}
+    for turn in range(turns):
+        graph.invoke({'messages': [HumanMessage(content=f"question {turn}")]}, config)
+    return graph.get_state(config).values['messages']
+
+def test_put_keeps_only_the_last_checkpoints(engine):
+    saver = SQLAlchemyCheckpointSaver(engine, keep=2)
+    messages = run_turns(saver, 'chat-1', TURNS)
+
+    # The state is whole, while storage is bounded however many turns the chat had
+    assert len(messages) == TURNS * 3
+    assert [message.content for message in messages[-3:]] == [f"question {TURNS - 1}", f"reply {TURNS * 3 - 2}", f"reply {TURNS * 3 - 1}"]
+    assert count(engine, GraphCheckpoint.__table__) == 2
+    assert count(engine, GraphCheckpointBlob.__table__, GraphCheckpointBlob.channel == 'messages') <= 2
+    # Writes can be saved after a later checkpoint (LangGraph saves them in the background), so a
+    # few of the last turn's may outlive their checkpoint until the next put prunes them
+    assert count(engine, GraphCheckpointWrite.__table__) <= MAX_WRITES
+
+def test_prune_leaves_other_threads_alone(engine):
+    saver = SQLAlchemyCheckpointSaver(engine, keep=3)
+    run_turns(saver, 'chat-1', 1)
+    run_turns(saver, 'chat-2', TURNS)
+
+    assert count(engine, GraphCheckpoint.__table__, GraphCheckpoint.thread_id == 'chat-1') == 3
+    assert count(engine, GraphCheckpoint.__table__, GraphCheckpoint.thread_id == 'chat-2') == 3
+
+def test_conversation_continues_after_pruning(engine):
+    saver = SQLAlchemyCheckpointSaver(engine, keep=2)
+    run_turns(saver, 'chat-1', TURNS)
+
+    messages = run_turns(SQLAlchemyCheckpointSaver(engine, keep=2), 'chat-1', 1)
+    assert len(messages) == (TURNS + 1) * 3
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from benchmarks.synthetic import generate_ohlcv
+from app.services import model_store
+from app.services.stock_forecast import preprocess_data, build_arimax_model
+from app.services.fast_forecast import build_batched_arx_models
+
+# The fast engine screens for the ARIMAX one, so on the same data and order their forecasts
+# should stay close: within a percentage point of expected return, and with intervals of a
+# similar width.
+MAX_RETURN_GAP = 1.0
+INTERVAL_WIDTH_RATIO = (0.5, 2.0)
+
+
+@pytest.fixture(autouse=True)
+def model_stores(tmp_path, monkeypatch):
+    # Every ARIMAX fit starts fresh, without reading or writing the stores of the working copy
+    monkeypatch.setattr(model_store, 'MODEL_STORE_DIR', str(tmp_path / 'models'))
+    monkeypatch.setattr(model_store, 'MODEL_CACHE_DIR', str(tmp_path / 'model_cache'))
+
+@pytest.fixture(scope='module')
+def preprocessed():
+    return preprocess_data(generate_ohlcv(8, 160, seed=0, end_date='2025-06-30'))
+
+def interval_width(result):
+    return result['confidence_intervals']['upper'][-1] - result['confidence_intervals']['lower'][-1]
+
+def test_fast_engine_matches_arimax(preprocessed):
+    tickers = list(preprocessed['Ticker'].unique())
+    fast = build_batched_arx_models(preprocessed, tickers, lags=3)
+
+    for ticker in tickers:
+        arimax = build_arimax_model(preprocessed[preprocessed['Ticker'] == ticker], order=(3, 1, 0))
+
+        assert abs(fast[ticker]['expected_return'] - arimax['expected_return']) < MAX_RETURN_GAP, ticker
+        ratio = interval_width(fast[ticker]) / interval_width(arimax)
+        assert INTERVAL_WIDTH_RATIO[0] < ratio < INTERVAL_WIDTH_RATIO[1], ticker
+
+def test_fast_engine_does_not_extrapolate_last_move(preprocessed):
+    # A large last-day move must not be repeated at every step of the forecast
+    tickers = list(preprocessed['Ticker'].unique())
+    fast = build_batched_arx_models(preprocessed, tickers, lags=3)
+
+    for ticker in tickers:
+        close = preprocessed.loc[preprocessed['Ticker'] == ticker, 'Close'].to_numpy()
+        last_move = abs(close[-1] / close[-2] - 1) * 100
+        assert abs(fast[ticker]['expected_return']) < max(last_move, MAX_RETURN_GAP), ticker
+        assert np.isfinite(fast[ticker]['forecast']).all()